@@ -6,61 +6,316 @@ TMDB影史评分前250电影情感语料库爬虫程序
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import asyncio
+import csv
+import heapq
 import json
 import time
 import os
-import re
-import pandas as pd
-import numpy as np
+import threading
+import importlib.util
+import io
+import ahocorasick
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import List, Dict, Optional
+from functools import lru_cache
+from itertools import islice
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Iterable, List, Dict, Optional
+
+try:
+    import orjson
+except ImportError:  # 未安装orjson时退回标准库json
+    orjson = None
+
+# pandas/numpy只在保存数据和统计时用到，在对应函数内按需导入以加快启动
+if TYPE_CHECKING:
+    import numpy as np
+
+
+def _is_word_char(char: str) -> bool:
+    """判断字符是否属于正则中的 \\w（用于模拟单词边界 \\b）"""
+    return char.isalnum() or char == '_'
+
+
+# 情感词典定义（用于情感分析），进程内只构建一次且不可修改
+_EMOTION_LEXICON = MappingProxyType({
+    # 基本情感
+    'joy': ('happy', 'joy', 'fun', 'funny', 'laughter', 'smile', 'cheerful', 
+           'delight', 'euphoria', 'bliss', 'elation', 'glee', '喜剧', '欢乐', '开心', '愉快'),
+    'sadness': ('sad', 'sadness', 'grief', 'sorrow', 'melancholy', 'depression',
+               'tear', 'cry', 'mourn', 'heartbreak', 'despair', 'misery', 
+               '悲剧', '悲伤', '难过', '忧郁'),
+    'anger': ('anger', 'angry', 'rage', 'fury', 'wrath', 'outrage', 'frustration',
+             'resentment', 'hostility', 'irritation', 'annoyance', '愤怒', '生气', '怒火'),
+    'fear': ('fear', 'scary', 'terror', 'horror', 'dread', 'panic', 'anxiety',
+            'fright', 'apprehension', 'trepidation', 'phobia', '恐惧', '恐怖', '害怕'),
+    'love': ('love', 'romance', 'passion', 'affection', 'adore', 'cherish',
+            'devotion', 'intimacy', 'tenderness', 'fondness', 'infatuation',
+            '爱情', '浪漫', '温馨', '甜蜜'),
+    'hope': ('hope', 'hopeful', 'optimism', 'faith', 'confidence', 'expectation',
+            'aspiration', 'dream', 'wish', 'anticipation', '希望', '梦想', '期待'),
+    'loneliness': ('lonely', 'loneliness', 'isolated', 'solitude', 'alone',
+                  'abandoned', 'desolate', 'secluded', 'forsaken', '孤独', '孤单', '寂寞'),
+    'inspiration': ('inspire', 'inspiring', 'motivation', 'encouraging', 
+                   'uplifting', 'empowering', 'moving', 'touching', '励志', '鼓舞', '激励'),
+    'tension': ('tense', 'tension', 'suspense', 'thrilling', 'nerve-racking',
+               'nail-biting', 'edge-of-seat', 'anxious', 'stressful', '紧张', '悬疑', '惊悚'),
+    'peace': ('peace', 'peaceful', 'calm', 'serene', 'tranquil', 'relaxed',
+             'quiet', 'soothing', 'placid', 'composed', '平静', '安宁', '宁静')
+})
+
+# 倒排表：小写词 -> (情感, 权重)，长词权重更高
+_WORD_TO_EMO = {word.lower(): (emotion, 2 if len(word) > 4 else 1)
+                for emotion, words in _EMOTION_LEXICON.items() for word in words}
+
+
+def _build_emotion_automaton() -> ahocorasick.Automaton:
+    """
+    预构建Aho-Corasick自动机，一次扫描即可匹配所有情感词
+    
+    返回:
+        ahocorasick.Automaton: 载荷为 (情感, 词, 权重, 是否需要单词边界)，逐词的判断都在这里预先算好
+    """
+    automaton = ahocorasick.Automaton()
+    for word, (emotion, weight) in _WORD_TO_EMO.items():
+        automaton.add_word(word, (emotion, word, weight, len(word) <= 3))
+    automaton.make_automaton()
+    return automaton
+
+
+# 导入时构建一次，所有爬虫实例共享
+_EMO_AC = _build_emotion_automaton()
+
+
+class _RateLimiter:
+    """线程安全的令牌桶限流器，多个工作线程共享同一个请求配额"""
+    
+    def __init__(self, rate: float, capacity: int):
+        """
+        参数:
+            rate: 每秒补充的令牌数
+            capacity: 令牌桶容量（允许的突发请求数）
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def acquire(self):
+        """取出一个令牌，令牌不足时等待到下一个令牌补充"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class _RateLimitedAdapter(HTTPAdapter):
+    """发送前先从令牌桶取得配额的连接池适配器（缓存命中的请求不会走到这里）"""
+    
+    def __init__(self, rate_limiter: _RateLimiter, **kwargs):
+        self.rate_limiter = rate_limiter
+        super().__init__(**kwargs)
+    
+    def send(self, request, **kwargs):
+        self.rate_limiter.acquire()
+        return super().send(request, **kwargs)
 
 
 class TMDBTopRatedCrawler:
     """TMDB Top Rated电影数据爬虫"""
     
-    def __init__(self, api_key: str):
+    # 后备情感分析使用的扩展情感词典（更全面的词汇）
+    _EXTENDED_LEXICON = {
+        'joy': ['happy', 'joy', 'fun', 'funny', 'laughter', 'smile', 'cheerful', 
+               'delight', 'euphoria', 'bliss', 'elation', 'glee', 'comic', 'humor',
+               'lighthearted', '喜剧', '欢乐', '开心', '愉快', '搞笑', '幽默'],
+        'sadness': ['sad', 'sadness', 'grief', 'sorrow', 'melancholy', 'depression',
+                   'tear', 'cry', 'mourn', 'heartbreak', 'despair', 'misery', 'tragedy',
+                   'loss', 'death', 'dying', 'grave', 'funeral', '悲剧', '悲伤', '难过'],
+        'anger': ['anger', 'angry', 'rage', 'fury', 'wrath', 'outrage', 'frustration',
+                 'resentment', 'hostility', 'irritation', 'annoyance', 'violence',
+                 'fight', 'war', 'conflict', 'battle', '愤怒', '生气', '怒火', '暴力'],
+        'fear': ['fear', 'scary', 'terror', 'horror', 'dread', 'panic', 'anxiety',
+                'fright', 'apprehension', 'trepidation', 'phobia', 'monster',
+                'ghost', 'haunted', 'supernatural', '恐惧', '恐怖', '害怕', '惊吓'],
+        'love': ['love', 'romance', 'passion', 'affection', 'adore', 'cherish',
+                'devotion', 'intimacy', 'tenderness', 'fondness', 'infatuation',
+                'relationship', 'couple', 'marriage', 'wedding', '爱情', '浪漫', '温馨'],
+        'hope': ['hope', 'hopeful', 'optimism', 'faith', 'confidence', 'expectation',
+                'aspiration', 'dream', 'wish', 'anticipation', 'future', 'better',
+                'improve', 'recover', 'heal', '希望', '梦想', '期待', '信念'],
+        'loneliness': ['lonely', 'loneliness', 'isolated', 'solitude', 'alone',
+                      'abandoned', 'desolate', 'secluded', 'forsaken', '孤独', '孤单'],
+        'tension': ['tense', 'tension', 'suspense', 'thrilling', 'nerve-racking',
+                   'nail-biting', 'edge-of-seat', 'anxious', 'stressful', '紧张', '悬疑'],
+        'peace': ['peace', 'peaceful', 'calm', 'serene', 'tranquil', 'relaxed',
+                 'quiet', 'soothing', 'placid', 'composed', '平静', '安宁', '宁静'],
+        'inspiration': ['inspire', 'inspiring', 'motivation', 'encouraging', 
+                       'uplifting', 'empowering', 'moving', 'touching', '励志', '鼓舞']
+    }
+    
+    # 基于电影类型推断情感
+    _GENRE_EMOTION_MAP = {
+        '喜剧': 'joy', '喜剧片': 'joy', 'Comedy': 'joy',
+        '剧情': 'sadness', '剧情片': 'sadness', 'Drama': 'sadness',
+        '恐怖': 'fear', '恐怖片': 'fear', 'Horror': 'fear',
+        '爱情': 'love', '爱情片': 'love', 'Romance': 'love',
+        '科幻': 'hope', '科幻片': 'hope', 'Science Fiction': 'hope',
+        '惊悚': 'tension', '惊悚片': 'tension', 'Thriller': 'tension',
+        '动作': 'tension', '动作片': 'tension', 'Action': 'tension',
+        '冒险': 'joy', '冒险片': 'joy', 'Adventure': 'joy',
+        '动画': 'joy', '动画片': 'joy', 'Animation': 'joy',
+        '家庭': 'joy', '家庭片': 'joy', 'Family': 'joy',
+        '战争': 'fear', '战争片': 'fear', 'War': 'fear',
+        '犯罪': 'anger', '犯罪片': 'anger', 'Crime': 'anger',
+        '悬疑': 'tension', '悬疑片': 'tension', 'Mystery': 'tension'
+    }
+    
+    # 已知电影片名在后备自动机中的类别标记
+    _KNOWN_MOVIE_CATEGORY = '__known__'
+    
+    # 已知电影信息（硬编码一些知名电影的情感）
+    _KNOWN_MOVIE_EMOTIONS = {
+        '教父': {'tension': 3, 'anger': 2, 'sadness': 2},
+        '教父2': {'tension': 3, 'anger': 2, 'sadness': 3},
+        '辛德勒的名单': {'sadness': 4, 'hope': 2, 'inspiration': 3},
+        '肖申克的救赎': {'hope': 4, 'sadness': 2, 'inspiration': 3},
+        '盗梦空间': {'tension': 3, 'hope': 2, 'fear': 1},
+        '阿甘正传': {'hope': 3, 'joy': 2, 'inspiration': 3},
+        '泰坦尼克号': {'love': 4, 'sadness': 3, 'fear': 2},
+        '美丽人生': {'hope': 3, 'joy': 2, 'sadness': 3},
+        '钢琴家': {'sadness': 4, 'fear': 3, 'hope': 2},
+        '拯救大兵瑞恩': {'fear': 3, 'anger': 2, 'hope': 2},
+        '指环王': {'hope': 3, 'joy': 2, 'tension': 2},
+        '哈利波特': {'joy': 3, 'fear': 2, 'hope': 2},
+        '星球大战': {'hope': 3, 'joy': 2, 'tension': 2},
+        '黑客帝国': {'tension': 3, 'hope': 2, 'fear': 1},
+        '沉默的羔羊': {'fear': 4, 'tension': 3, 'anger': 1},
+        '低俗小说': {'joy': 3, 'tension': 2, 'anger': 1},
+        '飞越疯人院': {'hope': 3, 'sadness': 2, 'anger': 2},
+        '闪灵': {'fear': 4, 'tension': 3, 'anger': 1},
+        '公民凯恩': {'sadness': 3, 'anger': 2, 'hope': 1},
+        '七武士': {'tension': 3, 'hope': 2, 'sadness': 2}
+    }
+    
+    # 影评情感关键词
+    _POSITIVE_WORDS = ('good', 'great', 'excellent', 'amazing', 'wonderful',
+                       'love', 'like', 'enjoy', 'best', 'awesome', '推荐', '精彩', '经典')
+    _NEGATIVE_WORDS = ('bad', 'terrible', 'awful', 'poor', 'disappointing',
+                       'hate', 'dislike', 'worst', 'boring', '糟糕', '失望', '无聊')
+    
+    # 情感词典（模块级只读映射，所有实例共享）
+    emotion_lexicon = _EMOTION_LEXICON
+    
+    # 单次请求的超时（秒），避免个别卡住的连接一直占用工作线程
+    _REQUEST_TIMEOUT = 10
+    
+    def __init__(self, api_key: str, requests_per_second: float = 40):
         """
         初始化爬虫
         
         参数:
             api_key: TMDB API密钥
+            requests_per_second: 所有线程合计的请求速率上限（TMDB上限约为每秒50次）
         """
         self.api_key = api_key
         self.base_url = "https://api.themoviedb.org/3"
-        self.session = requests.Session()
+        self.session = self._create_session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
             'Accept': 'application/json'
         })
+        self.session.params = {'api_key': api_key}
+        
+        # 连接池复用TLS连接并按速率发放请求配额（代替固定的sleep）；
+        # 429/5xx自动退避重试（遵循Retry-After）
+        # 只访问TMDB一个主机，所以只需一个连接池，池大小要大于线程池的工作线程数
+        adapter = _RateLimitedAdapter(
+            _RateLimiter(requests_per_second, capacity=max(1, int(requests_per_second))),
+            pool_connections=1,
+            pool_maxsize=32,
+            max_retries=Retry(
+                total=5,
+                backoff_factor=0.3,
+                status_forcelist=[429, 500, 502, 503, 504],
+                allowed_methods=['GET']
+            )
+        )
+        self.session.mount('https://', adapter)
+        
+        # 后备分析的扩展词典和已知电影片名同样预构建自动机
+        # 已知电影的载荷为 (类别标记, 片名, 在表中的顺序)
+        self._fallback_ac = ahocorasick.Automaton()
+        for emotion, words in self._EXTENDED_LEXICON.items():
+            for word in words:
+                weight = 2 if len(word) > 4 else 1
+                self._fallback_ac.add_word(word, (emotion, word, weight))
+        for order, known_title in enumerate(self._KNOWN_MOVIE_EMOTIONS):
+            self._fallback_ac.add_word(known_title.lower(), (self._KNOWN_MOVIE_CATEGORY, known_title, order))
+        self._fallback_ac.make_automaton()
+        
+        # 影评情感关键词自动机，载荷为 (是否正面, 关键词)
+        self._sentiment_ac = ahocorasick.Automaton()
+        for word in self._POSITIVE_WORDS:
+            self._sentiment_ac.add_word(word, (True, word))
+        for word in self._NEGATIVE_WORDS:
+            self._sentiment_ac.add_word(word, (False, word))
+        self._sentiment_ac.make_automaton()
+        
+        # 相同文本（重复爬取或模板化的简介/宣传语）的情感分析结果缓存
+        self._analyze_cached = lru_cache(maxsize=4096)(self._analyze_movie_emotion)
+        
+    def _create_session(self) -> requests.Session:
+        """
+        创建HTTP会话：安装了requests-cache时使用本地SQLite缓存（24小时有效），
+        重复运行时已下载的电影直接从缓存读取；否则使用普通会话
         
-        # 情感词典定义（用于情感分析）
-        self.emotion_lexicon = {
-            # 基本情感
-            'joy': ['happy', 'joy', 'fun', 'funny', 'laughter', 'smile', 'cheerful', 
-                   'delight', 'euphoria', 'bliss', 'elation', 'glee', '喜剧', '欢乐', '开心', '愉快'],
-            'sadness': ['sad', 'sadness', 'grief', 'sorrow', 'melancholy', 'depression',
-                       'tear', 'cry', 'mourn', 'heartbreak', 'despair', 'misery', 
-                       '悲剧', '悲伤', '难过', '忧郁'],
-            'anger': ['anger', 'angry', 'rage', 'fury', 'wrath', 'outrage', 'frustration',
-                     'resentment', 'hostility', 'irritation', 'annoyance', '愤怒', '生气', '怒火'],
-            'fear': ['fear', 'scary', 'terror', 'horror', 'dread', 'panic', 'anxiety',
-                    'fright', 'apprehension', 'trepidation', 'phobia', '恐惧', '恐怖', '害怕'],
-            'love': ['love', 'romance', 'passion', 'affection', 'adore', 'cherish',
-                    'devotion', 'intimacy', 'tenderness', 'fondness', 'infatuation',
-                    '爱情', '浪漫', '温馨', '甜蜜'],
-            'hope': ['hope', 'hopeful', 'optimism', 'faith', 'confidence', 'expectation',
-                    'aspiration', 'dream', 'wish', 'anticipation', '希望', '梦想', '期待'],
-            'loneliness': ['lonely', 'loneliness', 'isolated', 'solitude', 'alone',
-                          'abandoned', 'desolate', 'secluded', 'forsaken', '孤独', '孤单', '寂寞'],
-            'inspiration': ['inspire', 'inspiring', 'motivation', 'encouraging', 
-                           'uplifting', 'empowering', 'moving', 'touching', '励志', '鼓舞', '激励'],
-            'tension': ['tense', 'tension', 'suspense', 'thrilling', 'nerve-racking',
-                       'nail-biting', 'edge-of-seat', 'anxious', 'stressful', '紧张', '悬疑', '惊悚'],
-            'peace': ['peace', 'peaceful', 'calm', 'serene', 'tranquil', 'relaxed',
-                     'quiet', 'soothing', 'placid', 'composed', '平静', '安宁', '宁静']
-        }
+        返回:
+            requests.Session: HTTP会话
+        """
+        try:
+            import requests_cache
+        except ImportError:
+            return requests.Session()
+        
+        # 缓存键默认忽略api_key参数；请求失败时允许使用过期缓存
+        return requests_cache.CachedSession(
+            '.tmdb_cache',
+            backend='sqlite',
+            expire_after=86400,
+            allowable_methods=['GET'],
+            stale_if_error=True
+        )
+    
+    def _request_json(self, url: str, params: Dict) -> Dict:
+        """
+        发送GET请求并解析JSON（限流在连接池适配器中完成，429/5xx由重试策略处理）
         
+        参数:
+            url: 请求地址
+            params: 查询参数
+            
+        返回:
+            Dict: 解析后的JSON数据
+        """
+        response = self.session.get(url, params=params, timeout=self._REQUEST_TIMEOUT)
+        response.raise_for_status()
+        if orjson is not None:
+            # 直接解析原始字节，省去解码为str再交给json的开销
+            return orjson.loads(response.content)
+        return response.json()
+    
     def get_top_rated_movies(self, page: int = 1, language: str = 'zh-CN') -> List[Dict]:
         """
         获取Top Rated电影列表
@@ -74,18 +329,15 @@ class TMDBTopRatedCrawler:
         """
         url = f"{self.base_url}/movie/top_rated"
         params = {
-            'api_key': self.api_key,
             'language': language,
             'page': page
         }
         
         try:
-            response = self.session.get(url, params=params)
-            response.raise_for_status()
-            data = response.json()
+            data = self._request_json(url, params)
             
             movies = []
-            for movie in data.get('results', []):
+            for idx, movie in enumerate(data.get('results', [])):
                 movie_info = {
                     'id': movie.get('id'),
                     'title': movie.get('title', ''),
@@ -96,7 +348,7 @@ class TMDBTopRatedCrawler:
                     'vote_count': movie.get('vote_count', 0),
                     'popularity': movie.get('popularity', 0),
                     'poster_path': movie.get('poster_path', ''),
-                    'top_rated_rank': (page - 1) * 20 + data.get('results', []).index(movie) + 1  # 在Top Rated列表中的排名
+                    'top_rated_rank': (page - 1) * 20 + idx + 1  # 在Top Rated列表中的排名
                 }
                 movies.append(movie_info)
             
@@ -119,26 +371,20 @@ class TMDBTopRatedCrawler:
         """
         url = f"{self.base_url}/movie/{movie_id}"
         params = {
-            'api_key': self.api_key,
             'language': language,
             'append_to_response': 'credits,keywords'
         }
         
         try:
-            response = self.session.get(url, params=params)
-            response.raise_for_status()
-            data = response.json()
+            data = self._request_json(url, params)
             
-            # 提取导演信息
-            director = ''
-            for person in data.get('credits', {}).get('crew', []):
-                if person.get('job') == 'Director':
-                    director = person.get('name', '')
-                    break
+            # 提取导演信息（找到第一位导演即停止）
+            director = next((person.get('name', '') for person in data.get('credits', {}).get('crew', [])
+                             if person.get('job') == 'Director'), '')
             
             # 提取主要演员
             cast = []
-            for person in data.get('credits', {}).get('cast', [])[:5]:
+            for person in islice(data.get('credits', {}).get('cast', ()), 5):
                 cast.append(person.get('name', ''))
             
             # 提取关键词
@@ -179,15 +425,12 @@ class TMDBTopRatedCrawler:
         """
         url = f"{self.base_url}/movie/{movie_id}/reviews"
         params = {
-            'api_key': self.api_key,
             'language': language,
             'page': 1
         }
         
         try:
-            response = self.session.get(url, params=params)
-            response.raise_for_status()
-            data = response.json()
+            data = self._request_json(url, params)
             
             reviews = []
             for review in data.get('results', [])[:max_reviews]:
@@ -227,14 +470,10 @@ class TMDBTopRatedCrawler:
         
         text_lower = text.lower()
         
-        # 简单的关键词匹配
-        positive_words = ['good', 'great', 'excellent', 'amazing', 'wonderful', 
-                         'love', 'like', 'enjoy', 'best', 'awesome', '推荐', '精彩', '经典']
-        negative_words = ['bad', 'terrible', 'awful', 'poor', 'disappointing', 
-                         'hate', 'dislike', 'worst', 'boring', '糟糕', '失望', '无聊']
-        
-        positive_count = sum(1 for word in positive_words if word in text_lower)
-        negative_count = sum(1 for word in negative_words if word in text_lower)
+        # 简单的关键词匹配：一次扫描找出出现过的关键词（每个词只计一次）
+        matched_words = {payload for _, payload in self._sentiment_ac.iter(text_lower)}
+        positive_count = sum(1 for is_positive, _ in matched_words if is_positive)
+        negative_count = len(matched_words) - positive_count
         
         total = positive_count + negative_count
         
@@ -265,30 +504,46 @@ class TMDBTopRatedCrawler:
         返回:
             Dict: 情感分析结果
         """
-        # 1. 主分析：合并所有文本进行分析
-        combined_text = f"{tagline} {overview} {' '.join(keywords)}".lower()
-        
-        emotion_scores = {}
-        total_score = 0
-        
-        for emotion, emotion_words in self.emotion_lexicon.items():
-            score = 0
-            for word in emotion_words:
-                # 改进的匹配：包含单词边界检查和模糊匹配
-                if len(word) <= 3:  # 短词
-                    pattern = r'\b' + re.escape(word) + r'\b'
-                    matches = re.findall(pattern, combined_text)
-                    score += len(matches)
-                else:  # 长词
-                    score += combined_text.count(word) * (2 if len(word) > 4 else 1)
-            
-            if score > 0:
-                emotion_scores[emotion] = score
-                total_score += score
+        # 分析结果只取决于输入文本，按文本缓存；返回新容器，调用方修改不会影响缓存
+        result = self._analyze_cached(overview, tagline, tuple(keywords), tuple(genres or ()))
+        return {
+            'emotion_profile': dict(result['emotion_profile']),
+            'dominant_emotions': list(result['dominant_emotions']),
+            'mood_tags': list(result['mood_tags']),
+            'emotional_complexity': result['emotional_complexity']
+        }
+    
+    def _analyze_movie_emotion(self, overview: str, tagline: str, keywords: tuple, genres: tuple) -> Dict:
+        """
+        分析电影情感氛围（不带缓存的实现，参数为可哈希的元组）
+        """
+        # 1. 主分析：合并所有文本进行分析（只做一次小写转换，后备分析复用）
+        title_text = f"{tagline} {overview}".lower()
+        combined_text = f"{title_text} {' '.join(keywords).lower()}"
+        
+        scores = dict.fromkeys(self.emotion_lexicon, 0)
+        last_end = {}
+        for end, (emotion, word, weight, bounded) in _EMO_AC.iter(combined_text):
+            start = end - len(word) + 1
+            # 与 str.count 一致：同一个词的匹配不重叠
+            if start <= last_end.get(word, -1):
+                continue
+            # 短词需要满足单词边界（等价于 \bword\b）
+            if bounded:
+                if start > 0 and _is_word_char(combined_text[start - 1]):
+                    continue
+                if end + 1 < len(combined_text) and _is_word_char(combined_text[end + 1]):
+                    continue
+            last_end[word] = end
+            scores[emotion] += weight
+        
+        emotion_scores = {emotion: score for emotion, score in scores.items() if score > 0}
+        total_score = sum(emotion_scores.values())
         
         # 2. 如果主分析没有结果，使用后备策略
         if not emotion_scores:
-            emotion_scores = self.fallback_emotion_analysis(overview, tagline, keywords, genres)
+            emotion_scores = self.fallback_emotion_analysis(overview, tagline, keywords, genres,
+                                                            lower_text=title_text)
             total_score = sum(emotion_scores.values())
         
         # 3. 归一化情感分数
@@ -313,109 +568,44 @@ class TMDBTopRatedCrawler:
             'emotional_complexity': len(normalized_scores)
         }
     
-    def fallback_emotion_analysis(self, overview: str, tagline: str, keywords: List[str], genres: List[str] = None) -> Dict[str, float]:
+    def fallback_emotion_analysis(self, overview: str, tagline: str, keywords: List[str], genres: List[str] = None,
+                                  lower_text: Optional[str] = None) -> Dict[str, float]:
         """
         后备情感分析策略
         当主分析失败时使用
-        """
-        emotion_scores = {}
         
+        参数:
+            lower_text: 已转为小写的 f"{tagline} {overview}"，为None时在此计算
+        """
         # 策略1：基于电影标题分析
-        title_text = f"{tagline} {overview}".lower()
-        
-        # 扩展的情感词典（更全面的词汇）
-        extended_emotion_lexicon = {
-            'joy': ['happy', 'joy', 'fun', 'funny', 'laughter', 'smile', 'cheerful', 
-                   'delight', 'euphoria', 'bliss', 'elation', 'glee', 'comic', 'humor',
-                   'lighthearted', '喜剧', '欢乐', '开心', '愉快', '搞笑', '幽默'],
-            'sadness': ['sad', 'sadness', 'grief', 'sorrow', 'melancholy', 'depression',
-                       'tear', 'cry', 'mourn', 'heartbreak', 'despair', 'misery', 'tragedy',
-                       'loss', 'death', 'dying', 'grave', 'funeral', '悲剧', '悲伤', '难过'],
-            'anger': ['anger', 'angry', 'rage', 'fury', 'wrath', 'outrage', 'frustration',
-                     'resentment', 'hostility', 'irritation', 'annoyance', 'violence',
-                     'fight', 'war', 'conflict', 'battle', '愤怒', '生气', '怒火', '暴力'],
-            'fear': ['fear', 'scary', 'terror', 'horror', 'dread', 'panic', 'anxiety',
-                    'fright', 'apprehension', 'trepidation', 'phobia', 'monster',
-                    'ghost', 'haunted', 'supernatural', '恐惧', '恐怖', '害怕', '惊吓'],
-            'love': ['love', 'romance', 'passion', 'affection', 'adore', 'cherish',
-                    'devotion', 'intimacy', 'tenderness', 'fondness', 'infatuation',
-                    'relationship', 'couple', 'marriage', 'wedding', '爱情', '浪漫', '温馨'],
-            'hope': ['hope', 'hopeful', 'optimism', 'faith', 'confidence', 'expectation',
-                    'aspiration', 'dream', 'wish', 'anticipation', 'future', 'better',
-                    'improve', 'recover', 'heal', '希望', '梦想', '期待', '信念'],
-            'loneliness': ['lonely', 'loneliness', 'isolated', 'solitude', 'alone',
-                          'abandoned', 'desolate', 'secluded', 'forsaken', '孤独', '孤单'],
-            'tension': ['tense', 'tension', 'suspense', 'thrilling', 'nerve-racking',
-                       'nail-biting', 'edge-of-seat', 'anxious', 'stressful', '紧张', '悬疑'],
-            'peace': ['peace', 'peaceful', 'calm', 'serene', 'tranquil', 'relaxed',
-                     'quiet', 'soothing', 'placid', 'composed', '平静', '安宁', '宁静'],
-            'inspiration': ['inspire', 'inspiring', 'motivation', 'encouraging', 
-                           'uplifting', 'empowering', 'moving', 'touching', '励志', '鼓舞']
-        }
-        
-        # 使用扩展词典分析
-        for emotion, words in extended_emotion_lexicon.items():
-            score = 0
-            for word in words:
-                if word in title_text:
-                    score += 2 if len(word) > 4 else 1
-            if score > 0:
-                emotion_scores[emotion] = score
+        title_text = lower_text if lower_text is not None else f"{tagline} {overview}".lower()
+        
+        # 使用扩展词典分析（一次扫描，每个词只计一次），同时定位简介中的已知电影片名
+        overview_start = len(tagline.lower()) + 1  # 简介在title_text中的起始位置（宣传语很短）
+        scores = dict.fromkeys(self._EXTENDED_LEXICON, 0)
+        matched_words = set()
+        known_movie = None
+        for end, (category, word, value) in self._fallback_ac.iter(title_text):
+            if category == self._KNOWN_MOVIE_CATEGORY:
+                # 片名只在简介中查找；多个命中时取表中最靠前的一部
+                if end - len(word) + 1 >= overview_start and (known_movie is None or value < known_movie[1]):
+                    known_movie = (word, value)
+            elif word not in matched_words:
+                matched_words.add(word)
+                scores[category] += value
+        emotion_scores = defaultdict(int, {emotion: score for emotion, score in scores.items() if score > 0})
         
         # 策略2：基于电影类型推断情感
         if genres and not emotion_scores:
-            genre_emotion_map = {
-                '喜剧': 'joy', '喜剧片': 'joy', 'Comedy': 'joy',
-                '剧情': 'sadness', '剧情片': 'sadness', 'Drama': 'sadness',
-                '恐怖': 'fear', '恐怖片': 'fear', 'Horror': 'fear',
-                '爱情': 'love', '爱情片': 'love', 'Romance': 'love',
-                '科幻': 'hope', '科幻片': 'hope', 'Science Fiction': 'hope',
-                '惊悚': 'tension', '惊悚片': 'tension', 'Thriller': 'tension',
-                '动作': 'tension', '动作片': 'tension', 'Action': 'tension',
-                '冒险': 'joy', '冒险片': 'joy', 'Adventure': 'joy',
-                '动画': 'joy', '动画片': 'joy', 'Animation': 'joy',
-                '家庭': 'joy', '家庭片': 'joy', 'Family': 'joy',
-                '战争': 'fear', '战争片': 'fear', 'War': 'fear',
-                '犯罪': 'anger', '犯罪片': 'anger', 'Crime': 'anger',
-                '悬疑': 'tension', '悬疑片': 'tension', 'Mystery': 'tension'
-            }
-            
             for genre in genres:
-                emotion = genre_emotion_map.get(genre)
+                emotion = self._GENRE_EMOTION_MAP.get(genre)
                 if emotion:
-                    emotion_scores[emotion] = emotion_scores.get(emotion, 0) + 2
-        
-        # 策略3：基于已知电影信息（硬编码一些知名电影的情感）
-        known_movie_emotions = {
-            '教父': {'tension': 3, 'anger': 2, 'sadness': 2},
-            '教父2': {'tension': 3, 'anger': 2, 'sadness': 3},
-            '辛德勒的名单': {'sadness': 4, 'hope': 2, 'inspiration': 3},
-            '肖申克的救赎': {'hope': 4, 'sadness': 2, 'inspiration': 3},
-            '盗梦空间': {'tension': 3, 'hope': 2, 'fear': 1},
-            '阿甘正传': {'hope': 3, 'joy': 2, 'inspiration': 3},
-            '泰坦尼克号': {'love': 4, 'sadness': 3, 'fear': 2},
-            '美丽人生': {'hope': 3, 'joy': 2, 'sadness': 3},
-            '钢琴家': {'sadness': 4, 'fear': 3, 'hope': 2},
-            '拯救大兵瑞恩': {'fear': 3, 'anger': 2, 'hope': 2},
-            '指环王': {'hope': 3, 'joy': 2, 'tension': 2},
-            '哈利波特': {'joy': 3, 'fear': 2, 'hope': 2},
-            '星球大战': {'hope': 3, 'joy': 2, 'tension': 2},
-            '黑客帝国': {'tension': 3, 'hope': 2, 'fear': 1},
-            '沉默的羔羊': {'fear': 4, 'tension': 3, 'anger': 1},
-            '低俗小说': {'joy': 3, 'tension': 2, 'anger': 1},
-            '飞越疯人院': {'hope': 3, 'sadness': 2, 'anger': 2},
-            '闪灵': {'fear': 4, 'tension': 3, 'anger': 1},
-            '公民凯恩': {'sadness': 3, 'anger': 2, 'hope': 1},
-            '七武士': {'tension': 3, 'hope': 2, 'sadness': 2}
-        }
+                    emotion_scores[emotion] += 2
         
-        # 检查是否是已知电影
-        title_lower = overview.lower() if overview else ''
-        for known_title, emotions in known_movie_emotions.items():
-            if known_title in title_lower:
-                for emotion, score in emotions.items():
-                    emotion_scores[emotion] = emotion_scores.get(emotion, 0) + score
-                break
+        # 策略3：基于已知电影信息
+        if known_movie is not None:
+            for emotion, score in self._KNOWN_MOVIE_EMOTIONS[known_movie[0]].items():
+                emotion_scores[emotion] += score
         
         # 策略4：如果还是没有结果，给一个默认的情感分布
         if not emotion_scores:
@@ -436,7 +626,7 @@ class TMDBTopRatedCrawler:
                     # 通用情感分布
                     emotion_scores = {'hope': 2, 'inspiration': 2, 'joy': 1, 'sadness': 1}
         
-        return emotion_scores
+        return dict(emotion_scores)
 
     
     def generate_mood_tags(self, emotion_profile: Dict) -> List[str]:
@@ -466,22 +656,28 @@ class TMDBTopRatedCrawler:
             elif score >= moderate_threshold:
                 tags.append(f"有些{emotion}")
         
-        # 特殊组合标签
-        if 'joy' in emotion_profile and 'love' in emotion_profile:
-            if emotion_profile.get('joy', 0) > 0.1 and emotion_profile.get('love', 0) > 0.1:
-                tags.append("温暖治愈")
+        # 特殊组合标签（每个情感分数只取一次，缺失的情感按0处理）
+        joy = emotion_profile.get('joy', 0)
+        love = emotion_profile.get('love', 0)
+        sadness = emotion_profile.get('sadness', 0)
+        hope = emotion_profile.get('hope', 0)
+        fear = emotion_profile.get('fear', 0)
+        peace = emotion_profile.get('peace', 0)
+        inspiration = emotion_profile.get('inspiration', 0)
+        
+        if joy > 0.1 and love > 0.1:
+            tags.append("温暖治愈")
         
-        if 'sadness' in emotion_profile and 'hope' in emotion_profile:
-            if emotion_profile.get('sadness', 0) > 0.1 and emotion_profile.get('hope', 0) > 0.05:
-                tags.append("悲伤但充满希望")
+        if sadness > 0.1 and hope > 0.05:
+            tags.append("悲伤但充满希望")
         
-        if 'fear' in emotion_profile and emotion_profile.get('fear', 0) > 0.15:
+        if fear > 0.15:
             tags.append("紧张刺激")
         
-        if 'peace' in emotion_profile and emotion_profile.get('peace', 0) > 0.1:
+        if peace > 0.1:
             tags.append("心灵平静")
         
-        if 'inspiration' in emotion_profile and emotion_profile.get('inspiration', 0) > 0.1:
+        if inspiration > 0.1:
             tags.append("励志感人")
         
         # 如果标签太少，添加一些通用标签
@@ -499,36 +695,74 @@ class TMDBTopRatedCrawler:
                     tags.append("情感真挚")
                     tags.append("值得一看")
         
-        return list(set(tags))[:6]  # 最多6个标签
+        return list(dict.fromkeys(tags))[:6]  # 去重并保持生成顺序，最多6个标签
 
     
-    def crawl_top_rated_movies(self, num_movies: int = 250, max_reviews_per_movie: int = 5) -> List[Dict]:
+    def crawl_top_rated_movies(self, num_movies: int = 250, max_reviews_per_movie: int = 5,
+                               max_workers: int = 16) -> List[Dict]:
         """
-        爬取Top Rated电影
+        并发爬取Top Rated电影（所有请求和情感分析共用一个线程池）
         
         参数:
             num_movies: 要爬取的电影数量
             max_reviews_per_movie: 每部电影最大影评数
+            max_workers: 线程池大小，即同时处理的电影数上限
             
         返回:
-            List[Dict]: 完整的电影数据
+            List[Dict]: 完整的电影数据（按列表顺序）
         """
         print(f"开始爬取影史评分前{num_movies}部电影...")
         
-        all_movies = []
-        collected_ids = set()
-        
         # 计算需要的页数（每页20部）
         pages_needed = (num_movies // 20) + 1
         if num_movies % 20 == 0:
             pages_needed = num_movies // 20
         
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            # 并发获取所有列表页（executor.map 按提交顺序返回结果）
+            print(f"获取 {pages_needed} 页Top Rated电影列表...")
+            pages = list(executor.map(self.get_top_rated_movies, range(1, pages_needed + 1)))
+            movie_list = self._collect_movie_list(pages, num_movies)
+            
+            # 每部电影的详情、影评和情感分析作为一个任务提交到同一线程池
+            total = len(movie_list)
+            return list(executor.map(
+                lambda item: self._process_movie(item[1], item[0], total, max_reviews_per_movie),
+                enumerate(movie_list, 1)
+            ))
+    
+    async def crawl_async(self, num_movies: int = 250, max_reviews_per_movie: int = 5,
+                          max_workers: int = 16) -> List[Dict]:
+        """
+        crawl_top_rated_movies 的异步版本，在工作线程中执行爬取，不阻塞调用方的事件循环
+        （可在Jupyter等已有事件循环的环境中 await）
+        
+        参数:
+            num_movies: 要爬取的电影数量
+            max_reviews_per_movie: 每部电影最大影评数
+            max_workers: 线程池大小，即同时处理的电影数上限
+            
+        返回:
+            List[Dict]: 完整的电影数据（按列表顺序）
+        """
+        return await asyncio.to_thread(self.crawl_top_rated_movies, num_movies,
+                                       max_reviews_per_movie, max_workers)
+    
+    def _collect_movie_list(self, pages: List[List[Dict]], num_movies: int) -> List[Dict]:
+        """
+        合并列表页结果并去重
+        
+        参数:
+            pages: 按页码排列的列表页电影
+            num_movies: 要爬取的电影数量
+            
+        返回:
+            List[Dict]: 去重后的电影列表
+        """
         # 收集电影列表
         movie_list = []
-        for page in range(1, pages_needed + 1):
-            print(f"获取第 {page} 页Top Rated电影列表...")
-            movies = self.get_top_rated_movies(page=page)
-            
+        collected_ids = set()
+        for page, movies in enumerate(pages, 1):
             if not movies:
                 print(f"第 {page} 页没有数据，停止获取")
                 break
@@ -539,139 +773,149 @@ class TMDBTopRatedCrawler:
                     movie_list.append(movie)
                     collected_ids.add(movie_id)
             
-            time.sleep(0.5)  # 礼貌延迟
-            
             if len(movie_list) >= num_movies:
                 break
         
         # 限制到指定数量
-        movie_list = movie_list[:num_movies]
+        return movie_list[:num_movies]
+    
+    def _process_movie(self, movie: Dict, index: int, total: int, max_reviews_per_movie: int) -> Dict:
+        """
+        获取单部电影的详情和影评，并完成情感分析（在线程池中执行）
         
-        # 处理每部电影
-        for i, movie in enumerate(movie_list, 1):
-            movie_id = movie['id']
-            top_rated_rank = movie.get('top_rated_rank', i)
-            
-            print(f"\n[{i}/{len(movie_list)}] 处理电影: {movie['title']} (TMDB Top Rated排名: {top_rated_rank})")
-            print(f"  评分: {movie['vote_average']}/10, 投票数: {movie['vote_count']:,}")
-            
-            # 获取详细信息
-            print("  获取详细信息...")
-            details = self.get_movie_details(movie_id)
-            time.sleep(0.3)
+        参数:
+            movie: Top Rated列表中的电影信息
+            index: 电影在本次爬取中的序号
+            total: 本次爬取的电影总数
+            max_reviews_per_movie: 每部电影最大影评数
             
-            # 获取影评
-            print("  获取影评...")
-            reviews = self.get_movie_reviews(movie_id, max_reviews=max_reviews_per_movie)
-            time.sleep(0.3)
+        返回:
+            Dict: 完整的电影数据
+        """
+        movie_id = movie['id']
+        top_rated_rank = movie.get('top_rated_rank', index)
+        
+        details = self.get_movie_details(movie_id)
+        reviews = self.get_movie_reviews(movie_id, max_reviews=max_reviews_per_movie)
+        
+        # 分析情感
+        emotion_analysis = self.analyze_movie_emotion(
+            overview=movie.get('overview', ''),
+            tagline=details.get('tagline', ''),
+            keywords=details.get('keywords', []),
+            genres=details.get('genres', [])
+        )
+        
+        # 构建完整电影数据
+        movie_data = {
+            'id': movie_id,
+            'title': movie.get('title', ''),
+            'original_title': movie.get('original_title', ''),
+            'release_date': movie.get('release_date', ''),
+            'release_year': movie.get('release_date', '')[:4] if movie.get('release_date') else '',
+            'overview': movie.get('overview', ''),
+            'vote_average': movie.get('vote_average', 0),
+            'vote_count': movie.get('vote_count', 0),
+            'popularity': movie.get('popularity', 0),
             
-            # 分析情感
-            print("  分析情感氛围...")
-            emotion_analysis = self.analyze_movie_emotion(
-    overview=movie.get('overview', ''),
-    tagline=details.get('tagline', ''),
-    keywords=details.get('keywords', []),
-    genres=details.get('genres', [])  # 添加这一行
-)
+            # Top Rated特定信息
+            'tmdb_top_rated_rank': top_rated_rank,
             
-            # 构建完整电影数据
-            movie_data = {
-                'id': movie_id,
-                'title': movie.get('title', ''),
-                'original_title': movie.get('original_title', ''),
-                'release_date': movie.get('release_date', ''),
-                'release_year': movie.get('release_date', '')[:4] if movie.get('release_date') else '',
-                'overview': movie.get('overview', ''),
-                'vote_average': movie.get('vote_average', 0),
-                'vote_count': movie.get('vote_count', 0),
-                'popularity': movie.get('popularity', 0),
-                
-                # Top Rated特定信息
-                'tmdb_top_rated_rank': top_rated_rank,
-                
-                # 详细信息
-                'genres': details.get('genres', []),
-                'runtime': details.get('runtime', 0),
-                'director': details.get('director', ''),
-                'cast': details.get('cast', []),
-                'tagline': details.get('tagline', ''),
-                'keywords': details.get('keywords', []),
-                'imdb_id': details.get('imdb_id', ''),
-                
-                # 情感分析结果
-                'emotion_profile': emotion_analysis.get('emotion_profile', {}),
-                'dominant_emotions': emotion_analysis.get('dominant_emotions', []),
-                'mood_tags': emotion_analysis.get('mood_tags', []),
-                'emotional_complexity': emotion_analysis.get('emotional_complexity', 0),
-                
-                # 影评
-                'reviews': reviews,
-                'review_count': len(reviews),
-                
-                # 爬虫信息
-                'source': 'tmdb_top_rated',
-                'crawl_date': datetime.now().isoformat()
-            }
+            # 详细信息
+            'genres': details.get('genres', []),
+            'runtime': details.get('runtime', 0),
+            'director': details.get('director', ''),
+            'cast': details.get('cast', []),
+            'tagline': details.get('tagline', ''),
+            'keywords': details.get('keywords', []),
+            'imdb_id': details.get('imdb_id', ''),
             
-            all_movies.append(movie_data)
+            # 情感分析结果
+            'emotion_profile': emotion_analysis.get('emotion_profile', {}),
+            'dominant_emotions': emotion_analysis.get('dominant_emotions', []),
+            'mood_tags': emotion_analysis.get('mood_tags', []),
+            'emotional_complexity': emotion_analysis.get('emotional_complexity', 0),
             
-            print(f"  ✓ 完成: {movie['title']}")
-            print(f"     情感标签: {', '.join(emotion_analysis.get('mood_tags', []))}")
-            print(f"     主导情感: {', '.join(emotion_analysis.get('dominant_emotions', []))}")
+            # 影评
+            'reviews': reviews,
+            'review_count': len(reviews),
             
-            # 礼貌延迟
-            time.sleep(0.5)
+            # 爬虫信息
+            'source': 'tmdb_top_rated',
+            'crawl_date': datetime.now().isoformat()
+        }
+        
+        print(f"\n[{index}/{total}] ✓ 完成: {movie['title']} (TMDB Top Rated排名: {top_rated_rank})")
+        print(f"  评分: {movie['vote_average']}/10, 投票数: {movie['vote_count']:,}")
+        print(f"     情感标签: {', '.join(emotion_analysis.get('mood_tags', []))}")
+        print(f"     主导情感: {', '.join(emotion_analysis.get('dominant_emotions', []))}")
         
-        return all_movies
+        return movie_data
     
-    def save_data(self, movie_data: List[Dict], output_dir: str = 'top_rated_movies'):
+    def save_data(self, movie_data: List[Dict], output_dir: str = 'top_rated_movies',
+                  projection: Optional[Dict] = None):
         """
         保存爬取的数据
         
         参数:
             movie_data: 电影数据列表
             output_dir: 输出目录
+            projection: _project 的结果（可选，为None时在此计算），各写入函数共用
         """
         os.makedirs(output_dir, exist_ok=True)
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         
         print(f"\n开始保存数据到目录: {output_dir}")
         
-        # 1. 保存完整的JSON格式情感语料库
-        json_path = os.path.join(output_dir, f'top_rated_movie_emotions_{timestamp}.json')
-        with open(json_path, 'w', encoding='utf-8') as f:
-            json.dump(movie_data, f, ensure_ascii=False, indent=2)
-        print(f"✓ 情感语料库已保存: {json_path} ({len(movie_data)} 部电影)")
-        
-        # 2. 保存为CSV格式（用于原有程序）
-        csv_path = os.path.join(output_dir, f'top_rated_movies_{timestamp}.csv')
-        self.save_as_csv(movie_data, csv_path)
-        print(f"✓ CSV格式已保存: {csv_path}")
-        
-        # 3. 保存影评数据
-        reviews_path = os.path.join(output_dir, f'top_rated_reviews_{timestamp}.json')
-        self.save_reviews(movie_data, reviews_path)
-        print(f"✓ 影评数据已保存: {reviews_path}")
-        
-        # 4. 保存统计信息
-        stats_path = os.path.join(output_dir, f'top_rated_statistics_{timestamp}.txt')
-        self.save_statistics(movie_data, stats_path)
-        print(f"✓ 统计信息已保存: {stats_path}")
-        
-        # 5. 保存情感分析专用格式
-        emotion_csv_path = os.path.join(output_dir, f'top_rated_emotion_vectors_{timestamp}.csv')
-        self.save_emotion_vectors(movie_data, emotion_csv_path)
-        print(f"✓ 情感向量已保存: {emotion_csv_path}")
-        
-        # 6. 保存增强版CSV（用于电影推荐程序）
-        enhanced_csv_path = os.path.join(output_dir, f'enhanced_top_rated_movies_{timestamp}.csv')
-        self.save_enhanced_csv(movie_data, enhanced_csv_path)
-        print(f"✓ 增强版CSV已保存: {enhanced_csv_path}")
-        
-        # 7. 保存排名信息
-        ranking_path = os.path.join(output_dir, f'top_rated_ranking_{timestamp}.csv')
-        self.save_ranking(movie_data, ranking_path)
-        print(f"✓ 排名信息已保存: {ranking_path}")
+        # 共用列和统计信息只计算一次
+        if projection is None:
+            projection = self._project(movie_data)
+        columns = projection['columns']
+        
+        # 各文件互相独立，提交到线程池同时写出；按原顺序等待完成并输出结果
+        saved = []
+        with ThreadPoolExecutor(max_workers=7) as executor:
+            # 1. 保存完整的JSON格式情感语料库
+            json_path = os.path.join(output_dir, f'top_rated_movie_emotions_{timestamp}.json')
+            saved.append((executor.submit(self._write_json_array, movie_data, json_path),
+                          f"✓ 情感语料库已保存: {json_path} ({len(movie_data)} 部电影)"))
+            
+            # 2. 保存为CSV格式（用于原有程序）
+            csv_path = os.path.join(output_dir, f'top_rated_movies_{timestamp}.csv')
+            saved.append((executor.submit(self.save_as_csv, movie_data, csv_path, columns),
+                          f"✓ CSV格式已保存: {csv_path}"))
+            
+            # 3. 保存影评数据
+            reviews_path = os.path.join(output_dir, f'top_rated_reviews_{timestamp}.json')
+            saved.append((executor.submit(self.save_reviews, movie_data, reviews_path),
+                          f"✓ 影评数据已保存: {reviews_path}"))
+            
+            # 4. 保存统计信息
+            stats_path = os.path.join(output_dir, f'top_rated_statistics_{timestamp}.txt')
+            saved.append((executor.submit(self.save_statistics, movie_data, stats_path, projection),
+                          f"✓ 统计信息已保存: {stats_path}"))
+            
+            # 5. 保存情感分析专用格式（纯数值矩阵，安装了pyarrow时存为zstd压缩的Parquet）
+            emotion_ext = 'parquet' if importlib.util.find_spec('pyarrow') is not None else 'csv'
+            emotion_vectors_path = os.path.join(output_dir, f'top_rated_emotion_vectors_{timestamp}.{emotion_ext}')
+            # Parquet写入失败时会回退为CSV，实际路径以返回值为准
+            emotion_future = executor.submit(self.save_emotion_vectors, movie_data, emotion_vectors_path)
+            saved.append((emotion_future, None))
+            
+            # 6. 保存增强版CSV（用于电影推荐程序）
+            enhanced_csv_path = os.path.join(output_dir, f'enhanced_top_rated_movies_{timestamp}.csv')
+            saved.append((executor.submit(self.save_enhanced_csv, movie_data, enhanced_csv_path, columns),
+                          f"✓ 增强版CSV已保存: {enhanced_csv_path}"))
+            
+            # 7. 保存排名信息
+            ranking_path = os.path.join(output_dir, f'top_rated_ranking_{timestamp}.csv')
+            saved.append((executor.submit(self.save_ranking, movie_data, ranking_path, columns),
+                          f"✓ 排名信息已保存: {ranking_path}"))
+            
+            for future, message in saved:
+                result = future.result()  # 写入失败时在此抛出异常
+                print(message if future is not emotion_future else f"✓ 情感向量已保存: {result}")
+            emotion_vectors_path = emotion_future.result()
         
         # 返回文件路径供后续使用
         return {
@@ -679,214 +923,346 @@ class TMDBTopRatedCrawler:
             'csv_data': csv_path,
             'enhanced_csv': enhanced_csv_path,
             'reviews': reviews_path,
-            'emotion_vectors': emotion_csv_path,
+            'emotion_vectors': emotion_vectors_path,
             'ranking': ranking_path
         }
     
-    def save_as_csv(self, movie_data: List[Dict], csv_path: str):
-        """保存为CSV格式（兼容原有程序）"""
-        rows = []
-        for movie in movie_data:
-            row = {
-                'movie_id': movie['id'],
-                'title': movie['title'],
-                'original_title': movie.get('original_title', ''),
-                'plot': movie.get('overview', ''),
-                'genres': '|'.join(movie.get('genres', [])),
-                'year': movie.get('release_year', ''),
-                'rating': movie.get('vote_average', 0),
-                'vote_count': movie.get('vote_count', 0),
-                'director': movie.get('director', ''),
-                'runtime': movie.get('runtime', 0),
-                'tagline': movie.get('tagline', ''),
-                'mood_tags': '|'.join(movie.get('mood_tags', [])),
-                'dominant_emotions': '|'.join(movie.get('dominant_emotions', [])),
-                'review_count': movie.get('review_count', 0),
-                'tmdb_top_rated_rank': movie.get('tmdb_top_rated_rank', 0)
-            }
-            rows.append(row)
+    def _write_json_array(self, items: Iterable[Dict], json_path: str):
+        """
+        逐项写入带缩进的UTF-8 JSON数组（优先使用orjson），每次只序列化一个元素，
+        输出与一次性 dump 整个列表（indent=2）逐字节相同
         
-        df = pd.DataFrame(rows)
-        df.to_csv(csv_path, index=False, encoding='utf-8-sig')
+        参数:
+            items: 数组元素（可以是生成器）
+            json_path: 输出路径
+        """
+        with open(json_path, 'wb', buffering=1 << 20) as f:
+            f.write(b'[')
+            separator = b'\n  '
+            for item in items:
+                if orjson is not None:
+                    encoded = orjson.dumps(item, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+                else:
+                    encoded = json.dumps(item, ensure_ascii=False, indent=2).encode('utf-8')
+                # 元素整体再缩进一级（字符串内的换行已被转义，不受影响）
+                f.write(separator)
+                f.write(encoded.replace(b'\n', b'\n  '))
+                separator = b',\n  '
+            f.write(b']' if separator == b'\n  ' else b'\n]')
     
-    def save_enhanced_csv(self, movie_data: List[Dict], csv_path: str):
-        """保存为增强版CSV格式（包含更多情感信息）"""
-        rows = []
-        for movie in movie_data:
-            # 计算平均影评情感
-            avg_sentiment = 0.5
-            if movie.get('reviews'):
-                sentiment_scores = [r.get('sentiment', {}).get('score', 0.5) for r in movie['reviews']]
-                avg_sentiment = round(np.mean(sentiment_scores), 3)
-            
-            row = {
-                'movie_id': movie['id'],
-                'title': movie['title'],
-                'original_title': movie.get('original_title', ''),
-                'plot': movie.get('overview', ''),
-                'tagline': movie.get('tagline', ''),
-                'genres': '|'.join(movie.get('genres', [])),
-                'year': movie.get('release_year', ''),
-                'rating': movie.get('vote_average', 0),
-                'runtime': movie.get('runtime', 0),
-                'director': movie.get('director', ''),
-                'main_cast': '|'.join(movie.get('cast', [])[:3]),
-                
-                # Top Rated信息
-                'tmdb_top_rated_rank': movie.get('tmdb_top_rated_rank', 0),
-                
-                # 情感信息
-                'mood_tags': '|'.join(movie.get('mood_tags', [])),
-                'dominant_emotions': '|'.join(movie.get('dominant_emotions', [])),
-                'emotional_complexity': movie.get('emotional_complexity', 0),
-                
-                # 影评信息
-                'review_count': movie.get('review_count', 0),
-                'avg_review_sentiment': avg_sentiment,
-                
-                # 其他信息
-                'popularity': movie.get('popularity', 0),
-                'vote_count': movie.get('vote_count', 0),
-                
-                # 情感向量（简化版，只取前3个）
-                'emotion_vector': self.get_emotion_vector_string(movie.get('emotion_profile', {}))
-            }
-            rows.append(row)
+    def _write_csv(self, header: List[str], rows: Iterable[tuple], csv_path: str, encoding: str = 'utf-8-sig'):
+        """
+        用标准库csv直接写出表头和行元组，无需构建DataFrame
         
-        df = pd.DataFrame(rows)
+        参数:
+            header: 列名
+            rows: 与列名顺序一致的行元组（可以是生成器）
+            csv_path: 输出路径
+            encoding: 文件编码，默认带BOM以便Excel正确识别中文
+        """
+        with open(csv_path, 'w', newline='', encoding=encoding, buffering=1 << 20) as f:
+            writer = csv.writer(f, lineterminator=os.linesep)
+            writer.writerow(header)
+            writer.writerows(rows)
+    
+    def save_as_csv(self, movie_data: List[Dict], csv_path: str, columns: Optional[Dict[str, List[str]]] = None):
+        """保存为CSV格式（兼容原有程序），columns为 _project 结果中的共用列，为None时在此计算"""
+        if columns is None:
+            columns = self._project(movie_data)['columns']
+        
+        header = ['movie_id', 'title', 'original_title', 'plot', 'genres', 'year', 'rating', 'vote_count',
+                  'director', 'runtime', 'tagline', 'mood_tags', 'dominant_emotions', 'review_count',
+                  'tmdb_top_rated_rank']
+        rows = ((
+            movie['id'],
+            movie['title'],
+            movie.get('original_title', ''),
+            movie.get('overview', ''),
+            genres,
+            movie.get('release_year', ''),
+            movie.get('vote_average', 0),
+            movie.get('vote_count', 0),
+            movie.get('director', ''),
+            movie.get('runtime', 0),
+            movie.get('tagline', ''),
+            mood_tags,
+            dominant_emotions,
+            movie.get('review_count', 0),
+            movie.get('tmdb_top_rated_rank', 0)
+        ) for movie, genres, mood_tags, dominant_emotions in zip(
+            movie_data, columns['genres'], columns['mood_tags'], columns['dominant_emotions']))
+        
+        # 供程序读取，不写BOM
+        self._write_csv(header, rows, csv_path, encoding='utf-8')
+    
+    def save_enhanced_csv(self, movie_data: List[Dict], csv_path: str,
+                          columns: Optional[Dict[str, List[str]]] = None):
+        """保存为增强版CSV格式（包含更多情感信息），columns为 _project 结果中的共用列，为None时在此计算"""
+        import pandas as pd
+        
+        if columns is None:
+            columns = self._project(movie_data)['columns']
+        
+        avg_sentiments = self._average_review_sentiments(movie_data)
+        
+        # 按列构建DataFrame，每列一个列表推导，不再逐行创建字典
+        df = pd.DataFrame({
+            'movie_id': [movie['id'] for movie in movie_data],
+            'title': [movie['title'] for movie in movie_data],
+            'original_title': [movie.get('original_title', '') for movie in movie_data],
+            'plot': [movie.get('overview', '') for movie in movie_data],
+            'tagline': [movie.get('tagline', '') for movie in movie_data],
+            'genres': columns['genres'],
+            'year': [movie.get('release_year', '') for movie in movie_data],
+            'rating': [movie.get('vote_average', 0) for movie in movie_data],
+            'runtime': [movie.get('runtime', 0) for movie in movie_data],
+            'director': [movie.get('director', '') for movie in movie_data],
+            'main_cast': ['|'.join(islice(movie.get('cast', ()), 3)) for movie in movie_data],
+            
+            # Top Rated信息
+            'tmdb_top_rated_rank': [movie.get('tmdb_top_rated_rank', 0) for movie in movie_data],
+            
+            # 情感信息
+            'mood_tags': columns['mood_tags'],
+            'dominant_emotions': columns['dominant_emotions'],
+            'emotional_complexity': [movie.get('emotional_complexity', 0) for movie in movie_data],
+            
+            # 影评信息
+            'review_count': [movie.get('review_count', 0) for movie in movie_data],
+            'avg_review_sentiment': avg_sentiments,
+            
+            # 其他信息
+            'popularity': [movie.get('popularity', 0) for movie in movie_data],
+            'vote_count': [movie.get('vote_count', 0) for movie in movie_data],
+            
+            # 情感向量（简化版，只取前3个）
+            'emotion_vector': [self.get_emotion_vector_string(movie.get('emotion_profile', {}))
+                               for movie in movie_data]
+        })
         df.to_csv(csv_path, index=False, encoding='utf-8-sig')
     
-    def save_ranking(self, movie_data: List[Dict], ranking_path: str):
-        """保存排名信息"""
-        rows = []
-        for movie in movie_data:
-            row = {
-                'rank': movie.get('tmdb_top_rated_rank', 0),
-                'title': movie['title'],
-                'original_title': movie.get('original_title', ''),
-                'year': movie.get('release_year', ''),
-                'rating': movie.get('vote_average', 0),
-                'vote_count': movie.get('vote_count', 0),
-                'director': movie.get('director', ''),
-                'genres': '|'.join(movie.get('genres', [])),
-                'mood_tags': '|'.join(movie.get('mood_tags', [])[:3]),
-                'imdb_id': movie.get('imdb_id', '')
-            }
-            rows.append(row)
+    def _average_review_sentiments(self, movie_data: List[Dict]) -> 'np.ndarray':
+        """
+        计算每部电影的平均影评情感分数（没有影评的电影为0.5）
         
-        df = pd.DataFrame(rows)
-        df = df.sort_values('rank')
-        df.to_csv(ranking_path, index=False, encoding='utf-8-sig')
+        所有影评分数展平为一个数组后，用 np.add.reduceat 按电影分段求和
+        """
+        import numpy as np
+        
+        review_counts = np.fromiter((len(movie.get('reviews') or ()) for movie in movie_data),
+                                    dtype=np.int64, count=len(movie_data))
+        scores = np.fromiter((review.get('sentiment', {}).get('score', 0.5)
+                              for movie in movie_data for review in movie.get('reviews') or ()),
+                             dtype=np.float64, count=int(review_counts.sum()))
+        
+        avg_sentiments = np.full(len(movie_data), 0.5)
+        has_reviews = review_counts > 0
+        if has_reviews.any():
+            offsets = np.cumsum(review_counts) - review_counts
+            sums = np.add.reduceat(scores, offsets[has_reviews])
+            avg_sentiments[has_reviews] = np.round(sums / review_counts[has_reviews], 3)
+        return avg_sentiments
+    
+    def save_ranking(self, movie_data: List[Dict], ranking_path: str,
+                     columns: Optional[Dict[str, List[str]]] = None):
+        """保存排名信息，columns为 _project 结果中的共用列，为None时在此计算"""
+        if columns is None:
+            columns = self._project(movie_data)['columns']
+        
+        header = ['rank', 'title', 'original_title', 'year', 'rating', 'vote_count', 'director', 'genres',
+                  'mood_tags', 'imdb_id']
+        # 先按排名排序（保留原下标以取共用列），再逐行生成
+        ranked = sorted(enumerate(movie_data), key=lambda item: item[1].get('tmdb_top_rated_rank', 0))
+        genres = columns['genres']
+        rows = ((
+            movie.get('tmdb_top_rated_rank', 0),
+            movie['title'],
+            movie.get('original_title', ''),
+            movie.get('release_year', ''),
+            movie.get('vote_average', 0),
+            movie.get('vote_count', 0),
+            movie.get('director', ''),
+            genres[i],
+            '|'.join(islice(movie.get('mood_tags', ()), 3)),
+            movie.get('imdb_id', '')
+        ) for i, movie in ranked)
+        
+        self._write_csv(header, rows, ranking_path)
     
     def get_emotion_vector_string(self, emotion_profile: Dict) -> str:
         """将情感向量转换为字符串"""
         if not emotion_profile:
             return ''
         
-        # 取前3个最强烈的情感
-        top_emotions = sorted(emotion_profile.items(), key=lambda x: x[1], reverse=True)[:3]
+        # 取前3个最强烈的情感（并列时保持原顺序，与完整排序后取前3个一致）
+        top_emotions = heapq.nlargest(3, emotion_profile.items(), key=lambda x: x[1])
         return '|'.join([f"{emotion}:{score:.3f}" for emotion, score in top_emotions])
     
     def save_reviews(self, movie_data: List[Dict], reviews_path: str):
-        """保存影评数据"""
-        all_reviews = []
-        for movie in movie_data:
-            for review in movie.get('reviews', []):
-                review_data = {
-                    'movie_id': movie.get('id'),
-                    'movie_title': movie.get('title', ''),
-                    'rank': movie.get('tmdb_top_rated_rank', 0),
-                    'author': review.get('author', ''),
-                    'content': review.get('content', ''),
-                    'sentiment': review.get('sentiment', {}).get('sentiment', ''),
-                    'sentiment_score': review.get('sentiment', {}).get('score', 0),
-                    'created_at': review.get('created_at', ''),
-                    'source': review.get('source', '')
-                }
-                all_reviews.append(review_data)
-        
-        with open(reviews_path, 'w', encoding='utf-8') as f:
-            json.dump(all_reviews, f, ensure_ascii=False, indent=2)
+        """保存影评数据（逐条流式写入，不在内存中汇总全部影评）"""
+        def iter_reviews():
+            for movie in movie_data:
+                for review in movie.get('reviews', []):
+                    yield {
+                        'movie_id': movie.get('id'),
+                        'movie_title': movie.get('title', ''),
+                        'rank': movie.get('tmdb_top_rated_rank', 0),
+                        'author': review.get('author', ''),
+                        'content': review.get('content', ''),
+                        'sentiment': review.get('sentiment', {}).get('sentiment', ''),
+                        'sentiment_score': review.get('sentiment', {}).get('score', 0),
+                        'created_at': review.get('created_at', ''),
+                        'source': review.get('source', '')
+                    }
+        
+        self._write_json_array(iter_reviews(), reviews_path)
     
-    def save_statistics(self, movie_data: List[Dict], stats_path: str):
-        """保存统计信息"""
-        total_movies = len(movie_data)
-        total_reviews = sum(len(movie.get('reviews', [])) for movie in movie_data)
+    def _project(self, movie_data: List[Dict]) -> Dict:
+        """
+        一次遍历电影数据，同时得到各CSV共用的字符串列和语料库统计信息
+        （各写入函数、统计文件和控制台摘要共用，只计算一次）
         
-        # 情感统计
-        emotion_counter = {}
-        mood_tag_counter = {}
+        参数:
+            movie_data: 电影数据列表
+            
+        返回:
+            Dict: 电影数、影评数、评分/投票数数组及其均值、情感与标签计数、按排名排序的前10部电影，
+                  以及 'columns'：与movie_data顺序一致的共用列（类型、情绪标签、主导情感）
+        """
+        import numpy as np
         
-        for movie in movie_data:
-            for emotion in movie.get('dominant_emotions', []):
-                emotion_counter[emotion] = emotion_counter.get(emotion, 0) + 1
+        total_movies = len(movie_data)
+        total_reviews = 0
+        ratings = np.empty(total_movies)
+        votes = np.empty(total_movies, dtype=np.int64)
+        emotion_counter = Counter()
+        mood_tag_counter = Counter()
+        genres_column = [''] * total_movies
+        mood_tags_column = [''] * total_movies
+        dominant_emotions_column = [''] * total_movies
+        
+        # 一次遍历得到共用列、影评总数、评分数组和情感/标签计数
+        for i, movie in enumerate(movie_data):
+            mood_tags = movie.get('mood_tags', [])
+            dominant_emotions = movie.get('dominant_emotions', [])
+            genres_column[i] = '|'.join(movie.get('genres', []))
+            mood_tags_column[i] = '|'.join(mood_tags)
+            dominant_emotions_column[i] = '|'.join(dominant_emotions)
             
-            for tag in movie.get('mood_tags', []):
-                mood_tag_counter[tag] = mood_tag_counter.get(tag, 0) + 1
+            total_reviews += len(movie.get('reviews', []))
+            ratings[i] = movie['vote_average']
+            votes[i] = movie['vote_count']
+            emotion_counter.update(dominant_emotions)
+            mood_tag_counter.update(mood_tags)
+        
+        return {
+            'columns': {
+                'genres': genres_column,
+                'mood_tags': mood_tags_column,
+                'dominant_emotions': dominant_emotions_column
+            },
+            'total_movies': total_movies,
+            'total_reviews': total_reviews,
+            'ratings': ratings,
+            'votes': votes,
+            'avg_rating': ratings.mean(),
+            'avg_votes': votes.mean(),
+            'emotion_counter': emotion_counter,
+            'mood_tag_counter': mood_tag_counter,
+            'top_movies': sorted(movie_data, key=lambda x: x.get('tmdb_top_rated_rank', 0))[:10]
+        }
+    
+    def save_statistics(self, movie_data: List[Dict], stats_path: str, stats: Optional[Dict] = None):
+        """
+        保存统计信息
+        
+        参数:
+            movie_data: 电影数据列表
+            stats_path: 输出路径
+            stats: _project 的结果，为None时在此计算
+        """
+        if stats is None:
+            stats = self._project(movie_data)
+        total_movies = stats['total_movies']
+        total_reviews = stats['total_reviews']
+        avg_rating = stats['avg_rating']
+        avg_votes = stats['avg_votes']
+        emotion_counter = stats['emotion_counter']
+        mood_tag_counter = stats['mood_tag_counter']
+        
+        # 先在内存中拼出全文，最后一次性写入文件
+        buf = io.StringIO()
+        buf.write(f"TMDB影史评分前{total_movies}电影统计信息\n")
+        buf.write(f"生成时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+        buf.write("=" * 60 + "\n\n")
+        
+        buf.write(f"电影总数: {total_movies}\n")
+        buf.write(f"影评总数: {total_reviews}\n")
+        buf.write(f"平均每部电影影评数: {total_reviews/total_movies:.1f}\n")
+        
+        buf.write(f"平均评分: {avg_rating:.2f}/10\n")
+        buf.write(f"平均投票数: {avg_votes:,.0f}\n\n")
+        
+        buf.write("主导情感分布:\n")
+        for emotion, count in emotion_counter.most_common():
+            percentage = (count / total_movies) * 100
+            buf.write(f"  {emotion}: {count} ({percentage:.1f}%)\n")
+        
+        buf.write("\n情绪标签分布 (前20):\n")
+        for tag, count in mood_tag_counter.most_common(20):
+            percentage = (count / total_movies) * 100
+            buf.write(f"  {tag}: {count} ({percentage:.1f}%)\n")
+        
+        buf.write("\nTop 10电影:\n")
+        for movie in stats['top_movies']:
+            buf.write(f"\n  {movie.get('tmdb_top_rated_rank', 0)}. 《{movie['title']}》\n")
+            buf.write(f"     评分: {movie['vote_average']}/10, 投票: {movie['vote_count']:,}\n")
+            buf.write(f"     情感标签: {', '.join(movie.get('mood_tags', []))}\n")
+            buf.write(f"     主导情感: {', '.join(movie.get('dominant_emotions', []))}\n")
+            buf.write(f"     导演: {movie.get('director', '')}\n")
         
         with open(stats_path, 'w', encoding='utf-8') as f:
-            f.write(f"TMDB影史评分前{total_movies}电影统计信息\n")
-            f.write(f"生成时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            f.write("=" * 60 + "\n\n")
-            
-            f.write(f"电影总数: {total_movies}\n")
-            f.write(f"影评总数: {total_reviews}\n")
-            f.write(f"平均每部电影影评数: {total_reviews/total_movies:.1f}\n")
-            
-            # 平均评分
-            avg_rating = np.mean([m['vote_average'] for m in movie_data])
-            avg_votes = np.mean([m['vote_count'] for m in movie_data])
-            f.write(f"平均评分: {avg_rating:.2f}/10\n")
-            f.write(f"平均投票数: {avg_votes:,.0f}\n\n")
-            
-            f.write("主导情感分布:\n")
-            for emotion, count in sorted(emotion_counter.items(), key=lambda x: x[1], reverse=True):
-                percentage = (count / total_movies) * 100
-                f.write(f"  {emotion}: {count} ({percentage:.1f}%)\n")
-            
-            f.write("\n情绪标签分布 (前20):\n")
-            for tag, count in sorted(mood_tag_counter.items(), key=lambda x: x[1], reverse=True)[:20]:
-                percentage = (count / total_movies) * 100
-                f.write(f"  {tag}: {count} ({percentage:.1f}%)\n")
-            
-            f.write("\nTop 10电影:\n")
-            sorted_movies = sorted(movie_data, key=lambda x: x.get('tmdb_top_rated_rank', 0))
-            for movie in sorted_movies[:10]:
-                f.write(f"\n  {movie.get('tmdb_top_rated_rank', 0)}. 《{movie['title']}》\n")
-                f.write(f"     评分: {movie['vote_average']}/10, 投票: {movie['vote_count']:,}\n")
-                f.write(f"     情感标签: {', '.join(movie.get('mood_tags', []))}\n")
-                f.write(f"     主导情感: {', '.join(movie.get('dominant_emotions', []))}\n")
-                f.write(f"     导演: {movie.get('director', '')}\n")
+            f.write(buf.getvalue())
     
-    def save_emotion_vectors(self, movie_data: List[Dict], csv_path: str):
-        """保存情感向量（用于机器学习）"""
-        # 获取所有情感维度
-        all_emotions = set()
-        for movie in movie_data:
-            all_emotions.update(movie.get('emotion_profile', {}).keys())
-        
-        # 构建表头
-        headers = ['movie_id', 'title', 'year', 'rank'] + sorted(list(all_emotions))
-        
-        # 构建数据行
-        rows = []
-        for movie in movie_data:
-            emotion_profile = movie.get('emotion_profile', {})
-            row = [
-                movie['id'], 
-                movie['title'], 
-                movie.get('release_year', ''),
-                movie.get('tmdb_top_rated_rank', 0)
-            ]
-            
-            for emotion in sorted(list(all_emotions)):
-                row.append(emotion_profile.get(emotion, 0.0))
+    def save_emotion_vectors(self, movie_data: List[Dict], output_path: str) -> str:
+        """
+        保存情感向量（用于机器学习），扩展名为.parquet时保存为Parquet，否则保存为CSV
+        
+        参数:
+            movie_data: 电影数据列表
+            output_path: 输出路径
             
-            rows.append(row)
+        返回:
+            str: 实际写出的路径（Parquet写入失败时回退为同名.csv）
+        """
+        import pandas as pd
+        
+        # 情感分布展开为列（所有电影情感维度的并集），缺失的情感补0，列按情感名排序
+        emotion_df = pd.json_normalize([movie.get('emotion_profile', {}) for movie in movie_data])
+        emotion_df = emotion_df.reindex(sorted(emotion_df.columns), axis=1).fillna(0.0)
+        
+        meta_df = pd.DataFrame({
+            'movie_id': [movie['id'] for movie in movie_data],
+            'title': [movie['title'] for movie in movie_data],
+            # 年份是字符串（缺失时为''），转为可空整数：Parquet与读回CSV得到的类型一致，CSV内容不变
+            'year': pd.to_numeric(pd.Series([movie.get('release_year', '') for movie in movie_data], dtype=object),
+                                  errors='coerce').astype('Int64'),
+            'rank': [movie.get('tmdb_top_rated_rank', 0) for movie in movie_data]
+        })
         
-        # 保存为CSV
-        df = pd.DataFrame(rows, columns=headers)
-        df.to_csv(csv_path, index=False, encoding='utf-8-sig')
+        df = pd.concat([meta_df, emotion_df], axis=1)
+        if output_path.endswith('.parquet'):
+            try:
+                df.to_parquet(output_path, index=False, compression='zstd')
+                return output_path
+            except Exception as e:
+                # 例如pyarrow未编译zstd支持；删除可能写了一半的文件，改存CSV
+                print(f"⚠️  保存Parquet失败，改存为CSV: {e}")
+                if os.path.exists(output_path):
+                    os.remove(output_path)
+                output_path = os.path.splitext(output_path)[0] + '.csv'
+        df.to_csv(output_path, index=False, encoding='utf-8')  # 机器学习用数据，不写BOM
+        return output_path
 
 
 def main():
@@ -943,8 +1319,11 @@ def main():
             print("✗ 未能爬取到电影数据")
             return
         
+        # 共用列和统计信息只计算一次，保存数据和下面的摘要共用
+        stats = crawler._project(movie_data)
+        
         # 保存数据
-        file_paths = crawler.save_data(movie_data, output_dir)
+        file_paths = crawler.save_data(movie_data, output_dir, stats)
         
         # 显示结果
         print("\n" + "=" * 80)
@@ -956,38 +1335,31 @@ def main():
         print(f"  3. 排名信息 (CSV): {file_paths['ranking']}")
         print(f"  4. 基础数据 (CSV): {file_paths['csv_data']}")
         print(f"  5. 影评数据 (JSON): {file_paths['reviews']}")
-        print(f"  6. 情感向量 (CSV): {file_paths['emotion_vectors']}")
+        emotion_format = 'Parquet' if file_paths['emotion_vectors'].endswith('.parquet') else 'CSV'
+        print(f"  6. 情感向量 ({emotion_format}): {file_paths['emotion_vectors']}")
         
         # 显示统计信息
         print(f"\n📊 语料库统计:")
         print("-" * 40)
         print(f"电影总数: {len(movie_data)}")
         
-        total_reviews = sum(len(m.get('reviews', [])) for m in movie_data)
+        total_reviews = stats['total_reviews']
         print(f"影评总数: {total_reviews}")
         print(f"平均影评数/电影: {total_reviews/len(movie_data):.1f}")
         
         # 评分统计
-        avg_rating = np.mean([m['vote_average'] for m in movie_data])
-        avg_votes = np.mean([m['vote_count'] for m in movie_data])
-        print(f"平均评分: {avg_rating:.2f}/10")
-        print(f"平均投票数: {avg_votes:,.0f}")
+        print(f"平均评分: {stats['avg_rating']:.2f}/10")
+        print(f"平均投票数: {stats['avg_votes']:,.0f}")
         
         # 情感统计
-        emotion_counter = {}
-        for movie in movie_data:
-            for emotion in movie.get('dominant_emotions', []):
-                emotion_counter[emotion] = emotion_counter.get(emotion, 0) + 1
-        
         print(f"\n主导情感分布 (前5):")
-        for emotion, count in sorted(emotion_counter.items(), key=lambda x: x[1], reverse=True)[:5]:
+        for emotion, count in stats['emotion_counter'].most_common(5):
             percentage = (count / len(movie_data)) * 100
             print(f"  {emotion}: {count} ({percentage:.1f}%)")
         
         # 显示前10名电影
         print(f"\n🏆 影史评分前10名:")
-        sorted_movies = sorted(movie_data, key=lambda x: x.get('tmdb_top_rated_rank', 0))
-        for i, movie in enumerate(sorted_movies[:10], 1):
+        for i, movie in enumerate(stats['top_movies'], 1):
             print(f"  {i}. 《{movie['title']}》 (评分: {movie['vote_average']}/10)")
         
         # 下一步提示
@@ -1015,10 +1387,15 @@ if __name__ == "__main__":
     try:
         import requests
         import pandas
+        import ahocorasick
         print("✓ 依赖检查通过")
     except ImportError as e:
         print(f"✗ 缺少依赖: {e}")
-        print("请运行: pip install requests pandas numpy")
+        print("请运行: pip install requests pandas numpy pyahocorasick")
         exit(1)
     
+    # 可选依赖：缺少时自动退回较慢的实现
+    if orjson is None:
+        print("提示: 未安装orjson，将使用标准库json保存JSON文件（pip install orjson 可加快保存）")
+    
     main()
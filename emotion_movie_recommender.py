@@ -11,28 +11,176 @@
 4. 可视化情感分析结果
 """
 
+import hashlib
+import heapq
 import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from types import MappingProxyType
+import ahocorasick
 import numpy as np
 import pandas as pd
+import torch
 from typing import List, Dict, Tuple, Optional
-from sentence_transformers import SentenceTransformer, util
+from sentence_transformers import SentenceTransformer
 import config  # 导入配置文件
-import matplotlib.pyplot as plt
-import seaborn as sns
-from sklearn.metrics.pairwise import cosine_similarity
+# matplotlib只在可视化情感分布时用到，在 visualize_emotion_profile 内按需导入以加快启动
 import warnings
+try:
+    import simsimd
+except ImportError:  # 未安装simsimd时退回numpy矩阵乘法
+    simsimd = None
+try:
+    import faiss
+except ImportError:  # 未安装faiss时语义检索直接使用numpy矩阵乘法
+    faiss = None
+try:
+    from numba import njit, prange
+except ImportError:  # 未安装numba时不编译情感相似度内核
+    njit = None
 warnings.filterwarnings('ignore')
 
 
+# 查询情感关键词（英文情感 -> 中文关键词），进程内只构建一次且不可修改
+_QUERY_EMOTION_KEYWORDS = MappingProxyType({
+    'joy': ('快乐', '开心', '高兴', '愉快', '欢乐', '喜悦', '搞笑', '幽默', '喜剧'),
+    'sadness': ('悲伤', '难过', '伤心', '忧郁', '哀伤', '悲痛', '悲剧', '伤感'),
+    'anger': ('愤怒', '生气', '气愤', '怒火', '愤慨', '恼怒', '暴力'),
+    'fear': ('恐惧', '害怕', '恐怖', '惊吓', '惊悚', '恐慌', '可怕'),
+    'love': ('爱', '爱情', '恋爱', '浪漫', '甜蜜', '温馨', '感人', '温暖'),
+    'hope': ('希望', '期望', '盼望', '期待', '憧憬', '向往'),
+    'loneliness': ('孤独', '孤单', '寂寞', '孤立', '独处', '疏离'),
+    'inspiration': ('励志', '鼓舞', '激励', '振奋', '奋发', '向上'),
+    'tension': ('紧张', '刺激', '悬疑', '惊险', '惊心动魄', '扣人心弦'),
+    'peace': ('平静', '安宁', '宁静', '祥和', '安逸', '恬静')
+})
+
+
+def _build_query_emotion_automaton() -> ahocorasick.Automaton:
+    """
+    预构建查询情感关键词的Aho-Corasick自动机，一次扫描即可找出查询中的所有关键词
+    
+    返回:
+        ahocorasick.Automaton: 载荷为 (情感, 关键词)
+    """
+    automaton = ahocorasick.Automaton()
+    for emotion, keywords in _QUERY_EMOTION_KEYWORDS.items():
+        for keyword in keywords:
+            automaton.add_word(keyword, (emotion, keyword))
+    automaton.make_automaton()
+    return automaton
+
+
+# 导入时构建一次，所有推荐系统实例共享
+_QUERY_EMOTION_AC = _build_query_emotion_automaton()
+
+
+if njit is not None:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _emotion_dot_kernel(vectors_norm: np.ndarray, target_norm: np.ndarray) -> np.ndarray:
+        """
+        逐行计算情感向量与目标向量的点积（numba编译，10维内层循环可被展开为SIMD指令）
+        
+        参数:
+            vectors_norm: 按行归一化的 (N, 10) float32 情感矩阵
+            target_norm: 归一化的 (10,) float32 目标向量
+            
+        返回:
+            np.ndarray: 形状为 (N,) 的余弦相似度
+        """
+        num_rows, num_emotions = vectors_norm.shape
+        out = np.empty(num_rows, dtype=np.float32)
+        for i in prange(num_rows):
+            total = np.float32(0.0)
+            for j in range(num_emotions):
+                total += vectors_norm[i, j] * target_norm[j]
+            out[i] = total
+        return out
+else:
+    _emotion_dot_kernel = None
+
+
+def _top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    取分数最高的k个位置，按分数降序排列（同分时位置靠前者优先）
+    
+    用 argpartition 以 O(N) 选出候选，只对这k个候选排序，避免对全部N个分数做完整排序
+    
+    参数:
+        scores: 一维分数数组
+        k: 返回数量
+        
+    返回:
+        np.ndarray: 位置索引数组
+    """
+    n = len(scores)
+    k = min(k, n)
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    if k < n:
+        # 第k大的分数作为门槛：高于门槛的全部入选，等于门槛的按位置顺序补足k个
+        threshold = scores[np.argpartition(scores, n - k)[n - k]]
+        above = np.flatnonzero(scores > threshold)
+        ties = np.flatnonzero(scores == threshold)[:k - len(above)]
+        candidates = np.concatenate([above, ties])
+    else:
+        candidates = np.arange(n)
+    # lexsort 以最后一个键为主键：先按分数降序，同分再按位置升序
+    return candidates[np.lexsort((candidates, -scores[candidates]))]
+
+
+def _parse_int(text: str, default: int) -> int:
+    """
+    把用户输入解析为正整数，无法解析时返回默认值
+    
+    参数:
+        text: 输入文本（允许首尾空白）
+        default: 默认值
+        
+    返回:
+        int: 解析结果，最小为1
+    """
+    try:
+        return max(1, int(text.strip()))
+    except ValueError:
+        return default
+
+
 class EmotionMovieRecommender:
     """情感氛围电影推荐系统"""
     
-    def __init__(self, model_name: str = None):
+    # 电影嵌入文本模板，每个槽位要么为空，要么是以空格开头的完整子句
+    _MOVIE_TEXT_TEMPLATE = "电影《{title}》。{tagline}{plot}{genres}{year}{mood}{dominant}{emotion}"
+    # 嵌入文本中剧情的最大字符数
+    _MAX_PLOT_CHARS = 500
+    # ONNX后端int8动态量化使用的配置（对应 sentence_transformers 的 quantization_config）
+    _ONNX_QUANTIZATION_CONFIG = 'avx512_vnni'
+    # 电影数超过该值时语义索引改用IVF-PQ近似检索，否则使用精确的扁平内积索引
+    _IVFPQ_MIN_MOVIES = 5000
+    _IVFPQ_FACTORY = "IVF256,PQ16"
+    _IVFPQ_NPROBE = 8
+    # load_movies_from_csv 使用的列（评分之外都按字符串读取）
+    _CSV_TEXT_COLUMNS = ('movie_id', 'title', 'plot', 'genres', 'year',
+                         'mood_tags', 'dominant_emotions', 'emotion_vector')
+    
+    def __init__(self, model_name: str = None, encode_batch_size: int = 32, backend: str = 'torch',
+                 embedding_cache_dir: Optional[str] = '.cache', num_threads: Optional[int] = None,
+                 quantize: bool = False):
         """
         初始化推荐系统
         
         参数:
             model_name: 使用的嵌入模型名称，默认为None则使用config配置
+            encode_batch_size: 索引电影时每批编码的文本数量，内存充足时可调大
+            backend: 推理后端，'torch'（默认）、'onnx' 或 'openvino'，
+                     后两者需要 sentence-transformers>=3.2 及对应的 optimum 扩展
+            embedding_cache_dir: 语义嵌入的磁盘缓存目录，为None时不缓存
+            num_threads: PyTorch计算线程数，为None时不改动（沿用 OMP_NUM_THREADS 等环境设置或宿主程序的设置）；
+                         这是进程级设置，线程数超过物理核数（或与其他进程争抢CPU）反而会变慢
+            quantize: 是否做int8动态量化：PyTorch后端量化线性层，ONNX后端导出并加载
+                      int8量化的ONNX模型（导出结果保存在缓存目录中复用）；
+                      CPU推理更快，嵌入的余弦相似度会有轻微偏差
         """
         print("=" * 80)
         print("🎭 情感氛围电影推荐系统 - 初始化中...")
@@ -66,34 +214,145 @@ class EmotionMovieRecommender:
         # 固定的10种情感维度（与爬虫中定义的情感词典一致）
         self.fixed_emotion_labels = ['joy', 'sadness', 'anger', 'fear', 'love', 
                                    'hope', 'loneliness', 'inspiration', 'tension', 'peace']
+        # 情感标签 -> 向量列号，避免每次查询都对标签列表做线性查找
+        self._emotion_to_idx = {emotion: j for j, emotion in enumerate(self.fixed_emotion_labels)}
+        
+        self.encode_batch_size = encode_batch_size
+        self.embedding_cache_dir = embedding_cache_dir
+        
+        # 只有显式指定时才在加载模型前设置CPU线程数，默认不改动进程级的torch设置
+        if num_threads is not None:
+            self._configure_torch_threads(num_threads)
         
         # 加载嵌入模型
-        if model_name is None:
-            # 使用config文件的load_model函数（自动使用ModelScope镜像）
-            self.model = config.load_model(device='cpu')
-        else:
-            print(f"加载指定模型: {model_name}")
-            self.model = SentenceTransformer(model_name, trust_remote_code=True)
+        if backend != 'torch':
+            try:
+                print(f"使用 {backend} 推理后端")
+                if quantize and backend == 'onnx':
+                    self.model = self._load_quantized_onnx_model(model_name)
+                else:
+                    self.model = self._load_model(model_name, backend=backend)
+            except Exception as e:
+                print(f"⚠️  {backend} 后端加载失败: {e}")
+                print("   退回PyTorch后端...")
+                backend = 'torch'
+        if backend == 'torch':
+            self.model = self._load_model(model_name)
+            if quantize:
+                quantize = self._quantize_model()
+        elif quantize and backend != 'onnx':
+            print(f"⚠️  动态量化仅支持PyTorch和ONNX后端，{backend} 后端已跳过")
+            quantize = False
+        
+        # 模型标识（名称+后端+是否量化），作为嵌入缓存键的一部分
+        self._model_id = f"{model_name or config.get_model_name()}|{backend}|{'int8' if quantize else 'fp32'}"
         
         print("✓ 嵌入模型加载成功!")
         
+        # 相同查询（交互/演示中很常见）的嵌入与情感提取结果缓存，重复查询无需再做前向计算
+        self._encode_query_cached = lru_cache(maxsize=512)(self._encode_query)
+        self._extract_emotions_cached = lru_cache(maxsize=512)(self._extract_emotions_from_query)
+        
         # 初始化数据结构
         self.movies = []  # 原始电影数据
         self.movie_texts = []  # 用于嵌入的文本
-        self.semantic_embeddings = None  # 语义嵌入向量
+        self.semantic_embeddings = None  # 语义嵌入向量（已L2归一化）
+        self.text_index = None  # 语义嵌入的FAISS内积索引（安装了faiss时构建）
         self.emotion_vectors = None  # 情感向量矩阵
+        self.emotion_vectors_norm = None  # 按行L2归一化的情感向量矩阵
         self.emotion_labels = []  # 情感标签列表
-        self.emotion_profiles = {}  # 每部电影的情感分布
+        self._emotion_movie_ids = []  # 情感向量矩阵各行对应的电影ID
+        
+    @staticmethod
+    def _configure_torch_threads(num_threads: int):
+        """
+        设置PyTorch在CPU上推理的线程数（进程级设置）
+        
+        参数:
+            num_threads: 计算线程数
+        """
+        torch.set_num_threads(num_threads)
+        try:
+            # 编码是单个大算子串行执行，算子间并行只会带来额外的线程调度开销
+            torch.set_num_interop_threads(1)
+        except RuntimeError:
+            # 进程中已经执行过并行计算后不能再修改，保持现有设置即可
+            pass
+        print(f"PyTorch计算线程数: {torch.get_num_threads()}")
+    
+    def _quantize_model(self) -> bool:
+        """
+        对Transformer中的线性层做int8动态量化（原地替换，避免大模型复制一份权重）
+        
+        返回:
+            bool: 是否量化成功
+        """
+        try:
+            first_module = self.model._first_module()
+            first_module.auto_model = torch.ao.quantization.quantize_dynamic(
+                first_module.auto_model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+            print("✓ 模型线性层已动态量化为int8")
+            return True
+        except Exception as e:
+            print(f"⚠️  动态量化失败，继续使用原始精度模型: {e}")
+            return False
+    
+    def _load_quantized_onnx_model(self, model_name: Optional[str] = None) -> SentenceTransformer:
+        """
+        加载int8动态量化的ONNX模型；首次使用时先导出ONNX模型并量化，保存到缓存目录供之后复用
+        
+        参数:
+            model_name: 模型名称，为None时使用config配置
+            
+        返回:
+            SentenceTransformer: 使用量化ONNX模型的实例
+        """
+        base_name = model_name or config.get_model_name()
+        export_dir = os.path.join(self.embedding_cache_dir or '.cache', 'onnx_int8',
+                                  base_name.replace('/', '__').replace('\\', '__'))
+        file_name = f"onnx/model_qint8_{self._ONNX_QUANTIZATION_CONFIG}.onnx"
+        
+        if not os.path.exists(os.path.join(export_dir, file_name)):
+            from sentence_transformers import export_dynamic_quantized_onnx_model
+            print("首次使用量化ONNX模型，正在导出并量化（只需一次）...")
+            model = self._load_model(model_name, backend='onnx')
+            model.save(export_dir)
+            export_dynamic_quantized_onnx_model(model, self._ONNX_QUANTIZATION_CONFIG, export_dir)
+        
+        print(f"加载int8量化的ONNX模型: {export_dir}")
+        return SentenceTransformer(export_dir, device='cpu', backend='onnx', trust_remote_code=True,
+                                   model_kwargs={'file_name': file_name})
+    
+    @staticmethod
+    def _load_model(model_name: Optional[str] = None, **kwargs) -> SentenceTransformer:
+        """
+        加载嵌入模型
         
-    def load_movies_from_json(self, json_path: str) -> List[Dict]:
+        参数:
+            model_name: 模型名称，为None时使用config配置
+            **kwargs: 传给SentenceTransformer的额外参数（如backend）
+            
+        返回:
+            SentenceTransformer: 模型实例
+        """
+        if model_name is None:
+            # 使用config文件的load_model函数（自动使用ModelScope镜像）
+            return config.load_model(device='cpu', **kwargs)
+        print(f"加载指定模型: {model_name}")
+        return SentenceTransformer(model_name, trust_remote_code=True, **kwargs)
+    
+    def load_movies_from_json(self, json_path: str, return_matrix: bool = False):
         """
         从JSON文件加载电影情感数据
         
         参数:
             json_path: JSON文件路径
+            return_matrix: 为True时同时返回归一化后的 (N, 10) 情感矩阵，
+                           可直接传给 index_movies() 免去重复构建
             
         返回:
-            List[Dict]: 电影数据列表
+            List[Dict]: 电影数据列表；return_matrix为True时返回 (电影列表, 情感矩阵)，
+                        加载失败退回示例数据时情感矩阵为None
         """
         try:
             with open(json_path, 'r', encoding='utf-8') as f:
@@ -101,22 +360,23 @@ class EmotionMovieRecommender:
             
             print(f"✓ 成功从 {json_path} 加载 {len(data)} 部电影的情感数据")
             
+            # 一次遍历把情感分布填入 (N, 10) 矩阵，缺失的维度保持为0
+            emotion_matrix = np.zeros((len(data), len(self.fixed_emotion_labels)))
+            for i, movie in enumerate(data):
+                for emotion, value in movie.get('emotion_profile', {}).items():
+                    j = self._emotion_to_idx.get(emotion)
+                    if j is not None:
+                        emotion_matrix[i, j] = value
+            
+            # 按行归一化情感向量（总和为0的行保持不变）
+            totals = emotion_matrix.sum(axis=1)
+            emotion_matrix /= np.where(totals > 0, totals, 1.0)[:, None]
+            np.round(emotion_matrix, 3, out=emotion_matrix)
+            
             # 转换为标准格式
             formatted_movies = []
-            for movie in data:
-                # 检查情感分布数据
-                emotion_profile = movie.get('emotion_profile', {})
-                
-                # 确保情感向量包含所有10个维度，缺失的补0
-                fixed_emotion_profile = {}
-                for emotion in self.fixed_emotion_labels:
-                    fixed_emotion_profile[emotion] = emotion_profile.get(emotion, 0.0)
-                
-                # 归一化情感向量
-                total = sum(fixed_emotion_profile.values())
-                if total > 0:
-                    for emotion in fixed_emotion_profile:
-                        fixed_emotion_profile[emotion] = round(fixed_emotion_profile[emotion] / total, 3)
+            for movie, emotion_row in zip(data, emotion_matrix.tolist()):
+                fixed_emotion_profile = dict(zip(self.fixed_emotion_labels, emotion_row))
                 
                 # 构建标准电影记录
                 movie_record = {
@@ -153,11 +413,15 @@ class EmotionMovieRecommender:
             
             print(f"情感分布统计: {len(emotion_stats)}种情感被使用")
             
+            if return_matrix:
+                return formatted_movies, emotion_matrix
             return formatted_movies
             
         except Exception as e:
             print(f"✗ 加载JSON文件失败: {e}")
             print("将使用示例电影数据...")
+            if return_matrix:
+                return self.load_sample_movies(), None
             return self.load_sample_movies()
     
     def load_movies_from_csv(self, csv_path: str) -> List[Dict]:
@@ -171,41 +435,49 @@ class EmotionMovieRecommender:
             List[Dict]: 电影数据列表
         """
         try:
-            df = pd.read_csv(csv_path)
+            # 只解析用到的列，文本列直接按字符串读取，省去类型推断
+            df = pd.read_csv(csv_path,
+                             usecols=lambda name: name == 'rating' or name in self._CSV_TEXT_COLUMNS,
+                             dtype=dict.fromkeys(self._CSV_TEXT_COLUMNS, str))
             print(f"✓ 成功从 {csv_path} 加载 {len(df)} 部电影")
             
-            # 转换为标准格式
+            def column(name: str) -> List[str]:
+                """按列取出字符串形式的值，缺失的列视为空字符串"""
+                if name not in df.columns:
+                    return [''] * len(df)
+                return [str(value) for value in df[name].tolist()]
+            
+            def split_tags(values: List[str]) -> List[List[str]]:
+                """拆分以'|'连接的标签列"""
+                return [value.split('|') if '|' in value else [] for value in values]
+            
+            ratings = df['rating'].astype(float).tolist() if 'rating' in df.columns else [0.0] * len(df)
+            
+            # 按列整体处理后再组装记录，避免 iterrows() 逐行构造 Series
             movies = []
-            for _, row in df.iterrows():
+            for movie_id, title, plot, genres, year, rating, mood_tags, dominant_emotions, emotion_vector_str in zip(
+                    column('movie_id'), column('title'), column('plot'), split_tags(column('genres')),
+                    column('year'), ratings, split_tags(column('mood_tags')),
+                    split_tags(column('dominant_emotions')), column('emotion_vector')):
                 # 解析情感向量（如果存在）
-                emotion_profile = {}
-                emotion_vector_str = str(row.get('emotion_vector', ''))
-                if emotion_vector_str and ':' in emotion_vector_str:
-                    for pair in emotion_vector_str.split('|'):
-                        if ':' in pair:
-                            emotion, value = pair.split(':', 1)
-                            try:
-                                emotion_profile[emotion.strip()] = float(value.strip())
-                            except:
-                                pass
+                emotion_profile = self._parse_emotion_vector(emotion_vector_str)
                 
                 # 如果情感向量为空，创建一个默认向量
                 if not emotion_profile:
-                    for emotion in self.fixed_emotion_labels:
-                        emotion_profile[emotion] = 0.0
+                    emotion_profile = dict.fromkeys(self.fixed_emotion_labels, 0.0)
                 
                 movie = {
-                    'id': str(row.get('movie_id', '')),
-                    'title': str(row.get('title', '')),
-                    'plot': str(row.get('plot', '')),
-                    'genres': str(row.get('genres', '')).split('|') if '|' in str(row.get('genres', '')) else [],
-                    'year': str(row.get('year', '')),
-                    'rating': float(row.get('rating', 0)),
+                    'id': movie_id,
+                    'title': title,
+                    'plot': plot,
+                    'genres': genres,
+                    'year': year,
+                    'rating': rating,
                     
                     # 情感数据
                     'emotion_profile': emotion_profile,
-                    'mood_tags': str(row.get('mood_tags', '')).split('|') if '|' in str(row.get('mood_tags', '')) else [],
-                    'dominant_emotions': str(row.get('dominant_emotions', '')).split('|') if '|' in str(row.get('dominant_emotions', '')) else [],
+                    'mood_tags': mood_tags,
+                    'dominant_emotions': dominant_emotions,
                     'source': 'csv'
                 }
                 movies.append(movie)
@@ -216,6 +488,28 @@ class EmotionMovieRecommender:
             print(f"✗ 加载CSV文件失败: {e}")
             return []
     
+    @staticmethod
+    def _parse_emotion_vector(emotion_vector_str: str) -> Dict[str, float]:
+        """
+        解析 "情感:强度|情感:强度" 格式的情感向量字符串
+        
+        参数:
+            emotion_vector_str: 情感向量字符串
+            
+        返回:
+            Dict[str, float]: 情感分布，无法解析的项会被跳过
+        """
+        emotion_profile = {}
+        if emotion_vector_str and ':' in emotion_vector_str:
+            for pair in emotion_vector_str.split('|'):
+                if ':' in pair:
+                    emotion, value = pair.split(':', 1)
+                    try:
+                        emotion_profile[emotion.strip()] = float(value.strip())
+                    except ValueError:
+                        pass
+        return emotion_profile
+    
     def load_sample_movies(self) -> List[Dict]:
         """
         加载示例电影数据（包含情感信息）
@@ -309,64 +603,57 @@ class EmotionMovieRecommender:
         """
         texts = []
         for movie in movies:
-            # 构建综合文本描述，包含语义信息和情感信息
-            title = movie.get('title', '')
-            plot = movie.get('plot', '')
+            # 构建综合文本描述，包含语义信息和情感信息；缺失的字段对应空槽位
             tagline = movie.get('tagline', '')
+            plot = movie.get('plot', '')
             genres = movie.get('genres', [])
             year = movie.get('year', '')
             mood_tags = movie.get('mood_tags', [])
             dominant_emotions = movie.get('dominant_emotions', [])
             
-            # 组合所有信息
-            text_parts = []
-            
-            # 1. 电影基本信息
-            text_parts.append(f"电影《{title}》。")
-            
-            if tagline:
-                text_parts.append(f"宣传语：{tagline}。")
-            
-            if plot:
-                text_parts.append(f"剧情：{plot}")
-            
-            if genres:
-                genres_text = "，".join(genres)
-                text_parts.append(f"类型：{genres_text}。")
-            
-            if year:
-                text_parts.append(f"年份：{year}。")
-            
-            # 2. 情感信息
-            if mood_tags:
-                mood_text = "，".join(mood_tags[:5])  # 最多5个情绪标签
-                text_parts.append(f"情感氛围：{mood_text}。")
-            
-            if dominant_emotions:
-                emotion_text = "，".join(dominant_emotions)
-                text_parts.append(f"主导情感：{emotion_text}。")
-            
-            # 3. 情感描述（如果有详细情感分布）
+            # 情感描述（如果有详细情感分布）：只取前3个最强烈的情感
+            emotion_desc = ''
             emotion_profile = movie.get('emotion_profile', {})
             if emotion_profile:
-                # 只取前3个最强烈的情感
-                top_emotions = sorted(emotion_profile.items(), key=lambda x: x[1], reverse=True)[:3]
-                if top_emotions and any(score > 0 for _, score in top_emotions):
-                    emotion_desc = "，".join([f"{emotion}({score:.2f})" for emotion, score in top_emotions])
-                    text_parts.append(f"情感强度：{emotion_desc}。")
+                top_emotions = heapq.nlargest(3, emotion_profile.items(), key=lambda x: x[1])
+                if top_emotions[0][1] > 0:
+                    emotion_desc = " 情感强度：" + "，".join(
+                        f"{emotion}({score:.2f})" for emotion, score in top_emotions) + "。"
             
-            # 合并所有部分
-            full_text = " ".join(text_parts)
-            texts.append(full_text)
+            texts.append(self._MOVIE_TEXT_TEMPLATE.format(
+                title=movie.get('title', ''),
+                tagline=f" 宣传语：{tagline}。" if tagline else '',
+                # 剧情截断到固定长度，限制分词与编码开销
+                plot=f" 剧情：{plot[:self._MAX_PLOT_CHARS]}" if plot else '',
+                genres=f" 类型：{'，'.join(genres)}。" if genres else '',
+                year=f" 年份：{year}。" if year else '',
+                mood=f" 情感氛围：{'，'.join(mood_tags[:5])}。" if mood_tags else '',  # 最多5个情绪标签
+                dominant=f" 主导情感：{'，'.join(dominant_emotions)}。" if dominant_emotions else '',
+                emotion=emotion_desc
+            ))
         
         return texts
     
-    def extract_emotion_vectors(self, movies: List[Dict]):
+    @property
+    def emotion_profiles(self) -> pd.DataFrame:
+        """
+        每部电影的情感分布，以电影ID为行索引、情感为列，直接基于情感向量矩阵构建
+        
+        单部电影可用 emotion_profiles.loc[电影ID].to_dict() 取得 {情感: 强度}
+        """
+        if self.emotion_vectors is None:
+            return pd.DataFrame(columns=self.fixed_emotion_labels)
+        return pd.DataFrame(self.emotion_vectors, columns=self.emotion_labels,
+                            index=pd.Index(self._emotion_movie_ids, name='movie_id'))
+    
+    def extract_emotion_vectors(self, movies: List[Dict], emotion_matrix: Optional[np.ndarray] = None):
         """
         从电影数据中提取情感向量（修正版）
         
         参数:
             movies: 电影数据列表
+            emotion_matrix: 可选，load_movies_from_json() 已构建好的 (N, 10) 情感矩阵，
+                            提供时直接复用，不再逐部电影重建
         """
         print("提取电影情感向量...")
         
@@ -377,28 +664,29 @@ class EmotionMovieRecommender:
         # 构建情感向量矩阵
         num_movies = len(movies)
         num_emotions = len(self.emotion_labels)
+        self._emotion_movie_ids = [movie.get('id', i) for i, movie in enumerate(movies)]
         
-        self.emotion_vectors = np.zeros((num_movies, num_emotions))
-        self.emotion_profiles = {}
-        
-        for i, movie in enumerate(movies):
-            movie_id = movie.get('id', i)
-            emotion_profile = movie.get('emotion_profile', {})
-            
-            # 确保情感向量包含所有维度
-            full_profile = {}
-            for emotion in self.emotion_labels:
-                # 从电影数据中获取情感值，如果没有则为0
-                value = emotion_profile.get(emotion, 0.0)
-                # 确保值在0-1之间
-                full_profile[emotion] = max(0.0, min(1.0, float(value)))
-            
-            # 存储完整情感分布
-            self.emotion_profiles[movie_id] = full_profile
+        if emotion_matrix is not None:
+            # 确保值在0-1之间；情感值只保留3位小数，float32精度足够，内存带宽减半
+            self.emotion_vectors = np.clip(emotion_matrix, 0.0, 1.0).astype(np.float32)
+        else:
+            self.emotion_vectors = np.zeros((num_movies, num_emotions), dtype=np.float32)
             
-            # 构建情感向量
-            for j, emotion in enumerate(self.emotion_labels):
-                self.emotion_vectors[i, j] = full_profile.get(emotion, 0.0)
+            for i, movie in enumerate(movies):
+                emotion_profile = movie.get('emotion_profile', {})
+                
+                # 构建情感向量（缺失的情感为0，并确保值在0-1之间）
+                for emotion, value in emotion_profile.items():
+                    j = self._emotion_to_idx.get(emotion)
+                    if j is not None:
+                        self.emotion_vectors[i, j] = max(0.0, min(1.0, float(value)))
+        
+        # 预先按行归一化，检索时余弦相似度只需一次矩阵-向量乘法
+        # 全零向量的范数记为1，使其相似度保持为0
+        self._emotion_norms = np.linalg.norm(self.emotion_vectors, axis=1)
+        self._emotion_norms[self._emotion_norms == 0] = 1.0
+        # 保持连续的float32矩阵，便于SimSIMD走SIMD快速路径
+        self.emotion_vectors_norm = np.ascontiguousarray(self.emotion_vectors / self._emotion_norms[:, None])
         
         print(f"✓ 情感向量矩阵构建完成: {self.emotion_vectors.shape}")
         print(f"  情感向量样本（前3部电影）:")
@@ -406,12 +694,13 @@ class EmotionMovieRecommender:
             non_zero = np.count_nonzero(self.emotion_vectors[i])
             print(f"    电影{i+1}: {non_zero}个非零值, 最大值: {self.emotion_vectors[i].max():.3f}")
     
-    def index_movies(self, movies: List[Dict]):
+    def index_movies(self, movies: List[Dict], emotion_matrix: Optional[np.ndarray] = None):
         """
         索引电影数据，构建语义和情感向量
         
         参数:
             movies: 电影数据列表
+            emotion_matrix: 可选，load_movies_from_json(..., return_matrix=True) 返回的情感矩阵
         """
         print(f"\n开始索引 {len(movies)} 部电影...")
         
@@ -422,20 +711,158 @@ class EmotionMovieRecommender:
         print("1. 构建语义嵌入...")
         self.movie_texts = self.prepare_movie_texts(movies)
         
-        self.semantic_embeddings = self.model.encode(
-            self.movie_texts,
-            convert_to_tensor=True,
-            show_progress_bar=True,
-            batch_size=32
-        )
+        # 嵌入只取决于模型与文本：命中磁盘缓存时以内存映射方式加载，跳过编码
+        cache_path = self._embedding_cache_path(self.movie_texts)
+        self.semantic_embeddings = self._load_cached_embeddings(cache_path)
+        if self.semantic_embeddings is None:
+            # encode内部会先按文本长度排序再分批，批内填充很少，可放心调大批大小
+            # 直接返回float32的numpy矩阵，检索时走numpy/BLAS，无需torch张量
+            self.semantic_embeddings = self.model.encode(
+                self.movie_texts,
+                convert_to_numpy=True,
+                show_progress_bar=True,
+                batch_size=self.encode_batch_size,
+                normalize_embeddings=True
+            )
+            self._save_cached_embeddings(cache_path, self.semantic_embeddings)
         print(f"✓ 语义嵌入完成: {self.semantic_embeddings.shape}")
+        self._build_text_index(cache_path)
         
         # 提取情感向量
         print("2. 构建情感向量...")
-        self.extract_emotion_vectors(movies)
+        self.extract_emotion_vectors(movies, emotion_matrix)
         
         print("✓ 电影索引完成!")
     
+    def _embedding_cache_path(self, texts: List[str]) -> Optional[str]:
+        """
+        根据模型标识和全部电影文本计算嵌入缓存文件路径
+        
+        参数:
+            texts: 电影文本列表
+            
+        返回:
+            Optional[str]: 缓存文件路径，未启用缓存时为None
+        """
+        if not self.embedding_cache_dir:
+            return None
+        digest = hashlib.sha256(self._model_id.encode('utf-8'))
+        for text in texts:
+            digest.update(b'\0')
+            digest.update(text.encode('utf-8'))
+        return os.path.join(self.embedding_cache_dir, f"emb_{digest.hexdigest()[:16]}.npy")
+    
+    @staticmethod
+    def _load_cached_embeddings(cache_path: Optional[str]) -> Optional[np.ndarray]:
+        """
+        以只读内存映射方式加载缓存的语义嵌入
+        
+        参数:
+            cache_path: 缓存文件路径
+            
+        返回:
+            Optional[np.ndarray]: 嵌入矩阵，缓存不存在或损坏时为None
+        """
+        if not cache_path or not os.path.exists(cache_path):
+            return None
+        try:
+            embeddings = np.load(cache_path, mmap_mode='r')
+            print(f"✓ 从缓存加载语义嵌入: {cache_path}")
+            return embeddings
+        except Exception as e:
+            print(f"⚠️  读取嵌入缓存失败，将重新编码: {e}")
+            return None
+    
+    @staticmethod
+    def _save_cached_embeddings(cache_path: Optional[str], embeddings: np.ndarray):
+        """
+        把语义嵌入保存到缓存文件（先写临时文件再替换，避免留下不完整的缓存）
+        
+        参数:
+            cache_path: 缓存文件路径
+            embeddings: 嵌入矩阵
+        """
+        if not cache_path:
+            return
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            tmp_path = cache_path + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                np.save(f, embeddings)
+            os.replace(tmp_path, cache_path)
+        except Exception as e:
+            print(f"⚠️  保存嵌入缓存失败: {e}")
+    
+    def _build_text_index(self, cache_path: Optional[str] = None):
+        """
+        用FAISS内积索引组织语义嵌入（嵌入已L2归一化，内积即余弦相似度），未安装faiss时跳过
+        
+        电影数超过 _IVFPQ_MIN_MOVIES 时使用 _IVFPQ_FACTORY 描述的IVF-PQ近似索引，否则使用扁平索引
+        
+        参数:
+            cache_path: 嵌入缓存文件路径，索引与其同名保存（文件名包含索引类型），下次启动直接内存映射读取
+        """
+        self.text_index = None
+        if faiss is None:
+            return
+        n_movies, dim = self.semantic_embeddings.shape
+        # 大规模语料用倒排+乘积量化：只探查nprobe个分区，每条向量压缩到16字节（PQ16要求维度能被16整除）
+        index_spec = self._IVFPQ_FACTORY if n_movies > self._IVFPQ_MIN_MOVIES and dim % 16 == 0 else 'Flat'
+        index = self._new_text_index(dim, index_spec)
+        
+        # 索引类型写进文件名，阈值或索引配置变化后不会误用另一种索引的缓存
+        index_path = None
+        if cache_path:
+            index_path = f"{os.path.splitext(cache_path)[0]}.{index_spec.replace(',', '_')}.faiss"
+        if index_path and os.path.exists(index_path):
+            try:
+                # IO_FLAG_MMAP 对扁平索引仍会整体读入内存，IO_FLAG_MMAP_IFC（faiss>=1.8）才真正映射向量数据
+                cached = faiss.read_index(index_path, getattr(faiss, 'IO_FLAG_MMAP_IFC', faiss.IO_FLAG_MMAP))
+                if (type(cached) is type(index) and cached.d == dim and cached.ntotal == n_movies
+                        and cached.metric_type == faiss.METRIC_INNER_PRODUCT):
+                    if index_spec != 'Flat':
+                        cached.nprobe = self._IVFPQ_NPROBE
+                    self.text_index = cached
+                    print(f"✓ 从缓存加载FAISS语义索引: {index_path}")
+                    return
+                print("⚠️  FAISS索引缓存与当前配置不符，将重新构建")
+            except Exception as e:
+                print(f"⚠️  读取FAISS索引缓存失败，将重新构建: {e}")
+        
+        embeddings = np.ascontiguousarray(self.semantic_embeddings, dtype=np.float32)
+        if not index.is_trained:
+            index.train(embeddings)
+        index.add(embeddings)
+        if index_spec != 'Flat':
+            index.nprobe = self._IVFPQ_NPROBE
+        self.text_index = index
+        print(f"✓ FAISS语义索引构建完成: {index.ntotal} 条向量 ({type(index).__name__})")
+        
+        if index_path:
+            try:
+                os.makedirs(os.path.dirname(index_path), exist_ok=True)
+                tmp_path = index_path + '.tmp'
+                faiss.write_index(index, tmp_path)
+                os.replace(tmp_path, index_path)
+            except Exception as e:
+                print(f"⚠️  保存FAISS索引缓存失败: {e}")
+    
+    @staticmethod
+    def _new_text_index(dim: int, index_spec: str):
+        """
+        创建空的内积索引
+        
+        参数:
+            dim: 向量维度
+            index_spec: 'Flat' 或 faiss.index_factory 的索引描述字符串
+            
+        返回:
+            faiss.Index: 未添加向量的索引
+        """
+        if index_spec == 'Flat':
+            return faiss.IndexFlatIP(dim)
+        return faiss.index_factory(dim, index_spec, faiss.METRIC_INNER_PRODUCT)
+    
     def semantic_search(self, query: str, top_k: int = 5) -> List[Tuple[Dict, float]]:
         """
         基于语义相似度搜索电影
@@ -447,25 +874,34 @@ class EmotionMovieRecommender:
         返回:
             List[Tuple[Dict, float]]: 电影和相似度分数列表
         """
-        if self.semantic_embeddings is None:
-            raise ValueError("请先使用 index_movies() 方法索引电影")
-        
-        # 生成查询嵌入
-        query_embedding = self.model.encode(query, convert_to_tensor=True)
-        
-        # 计算语义相似度
-        semantic_similarities = util.cos_sim(query_embedding, self.semantic_embeddings)[0]
+        top_results = None
+        if self.text_index is not None:
+            # FAISS一次调用选出top_k个候选
+            query_embedding = np.ascontiguousarray(self._encode_query_cached(query)[None, :], dtype=np.float32)
+            top_k = min(top_k, self.text_index.ntotal)
+            if top_k <= 0:
+                return []
+            _, indices = self.text_index.search(query_embedding, top_k)
+            candidates = np.sort(indices[0][indices[0] >= 0])
+            # IVF索引探查的分区内候选不足top_k时会以-1补位，此时退回精确检索
+            if len(candidates) == top_k:
+                # IVF-PQ给出的是量化后的近似内积：用原始嵌入对候选重新精确打分并排序，
+                # semantic_score 与精确检索（及hybrid_search）的语义分数一致
+                exact_scores = self.semantic_embeddings[candidates] @ query_embedding[0]
+                top_results = [(int(candidates[i]), float(exact_scores[i]))
+                               for i in _top_k_indices(exact_scores, top_k)]
+        if top_results is None:
+            semantic_similarities = self._semantic_similarities(query)
+            top_results = ((idx, float(semantic_similarities[idx]))
+                           for idx in _top_k_indices(semantic_similarities, top_k))
         
         # 获取top_k结果
-        top_k = min(top_k, len(self.movies))
-        top_results = semantic_similarities.topk(k=top_k)
-        
         results = []
-        for score, idx in zip(top_results.values, top_results.indices):
+        for idx, score in top_results:
             movie_data = self.movies[idx].copy()
-            movie_data['semantic_score'] = score.item()
+            movie_data['semantic_score'] = score
             movie_data['emotion_score'] = 0.0  # 语义搜索不考虑情感
-            results.append((movie_data, score.item()))
+            results.append((movie_data, score))
         
         return results
     
@@ -480,28 +916,67 @@ class EmotionMovieRecommender:
         返回:
             List[Tuple[Dict, float]]: 电影和相似度分数列表
         """
+        emotion_similarities = self._emotion_similarities(target_emotions)
+        if emotion_similarities is None:
+            return []
+        
+        # 获取top_k结果
+        top_indices = _top_k_indices(emotion_similarities, top_k)
+        
+        results = []
+        for idx in top_indices:
+            similarity = emotion_similarities[idx]
+            movie_data = self.movies[idx].copy()
+            movie_data['semantic_score'] = 0.0  # 情感搜索不考虑语义
+            movie_data['emotion_score'] = similarity
+            results.append((movie_data, similarity))
+        
+        return results
+    
+    def _semantic_similarities(self, query: str) -> np.ndarray:
+        """
+        计算查询与所有电影的语义相似度
+        
+        参数:
+            query: 查询文本
+            
+        返回:
+            np.ndarray: 形状为 (N,) 的相似度，顺序与 self.movies 一致
+        """
+        if self.semantic_embeddings is None:
+            raise ValueError("请先使用 index_movies() 方法索引电影")
+        
+        # 生成查询嵌入（与索引一致做L2归一化，按查询文本缓存）
+        query_embedding = self._encode_query_cached(query)
+        
+        # 计算语义相似度（向量均已归一化，点积即余弦相似度）
+        return self.semantic_embeddings @ query_embedding
+    
+    def _emotion_similarities(self, target_emotions: Dict[str, float]) -> Optional[np.ndarray]:
+        """
+        计算目标情感与所有电影情感向量的余弦相似度
+        
+        参数:
+            target_emotions: 目标情感向量，格式为{情感: 强度}
+            
+        返回:
+            Optional[np.ndarray]: 形状为 (N,) 的相似度，顺序与 self.movies 一致；
+                                  目标情感向量全为零时返回None
+        """
         if self.emotion_vectors is None:
             raise ValueError("请先使用 index_movies() 方法索引电影")
         
-        # 转换情感标签为英文
-        converted_emotions = {}
+        # 构建目标情感向量
+        target_vector = np.zeros(len(self.emotion_labels))
         for emotion, intensity in target_emotions.items():
             # 将中文情感标签映射为英文
-            mapped_emotion = self.emotion_mapping.get(emotion, emotion)
-            if mapped_emotion in self.emotion_labels:
+            idx = self._emotion_to_idx.get(self.emotion_mapping.get(emotion, emotion))
+            if idx is not None:
                 # 确保强度在合理范围内
-                intensity_val = max(0.0, min(1.0, float(intensity)))
-                converted_emotions[mapped_emotion] = intensity_val
+                target_vector[idx] = max(0.0, min(1.0, float(intensity)))
             else:
                 print(f"警告: 情感标签 '{emotion}' 不在情感词典中")
         
-        # 构建目标情感向量
-        target_vector = np.zeros(len(self.emotion_labels))
-        for emotion, intensity in converted_emotions.items():
-            if emotion in self.emotion_labels:
-                idx = self.emotion_labels.index(emotion)
-                target_vector[idx] = intensity
-        
         # 归一化目标向量
         target_norm = np.linalg.norm(target_vector)
         if target_norm > 0:
@@ -512,24 +987,16 @@ class EmotionMovieRecommender:
         # 计算情感相似度（余弦相似度）
         if np.all(target_vector == 0):
             print("警告: 目标情感向量全为零，无法计算相似度")
-            return []
-        
-        # 计算情感相似度
-        emotion_similarities = cosine_similarity([target_vector], self.emotion_vectors)[0]
-        
-        # 获取top_k结果
-        top_k = min(top_k, len(self.movies))
-        top_indices = emotion_similarities.argsort()[-top_k:][::-1]
-        
-        results = []
-        for idx in top_indices:
-            similarity = emotion_similarities[idx]
-            movie_data = self.movies[idx].copy()
-            movie_data['semantic_score'] = 0.0  # 情感搜索不考虑语义
-            movie_data['emotion_score'] = similarity
-            results.append((movie_data, similarity))
-        
-        return results
+            return None
+        
+        # 计算情感相似度（目标向量与矩阵均已归一化，点积即余弦相似度）
+        target_vector = target_vector.astype(np.float32)
+        if simsimd is not None:
+            distances = simsimd.cdist(target_vector[None, :], self.emotion_vectors_norm, metric="cosine")
+            return 1.0 - np.asarray(distances)[0]
+        if _emotion_dot_kernel is not None:
+            return _emotion_dot_kernel(self.emotion_vectors_norm, target_vector)
+        return self.emotion_vectors_norm @ target_vector
     
     def hybrid_search(self, query: str, target_emotions: Optional[Dict[str, float]] = None,
                      semantic_weight: float = 0.7, emotion_weight: float = 0.3,
@@ -549,56 +1016,52 @@ class EmotionMovieRecommender:
         """
         print(f"执行混合搜索（语义权重: {semantic_weight}, 情感权重: {emotion_weight})...")
         
-        # 1. 获取目标情感向量
-        if target_emotions is None:
-            target_emotions = self.extract_emotions_from_query(query)
-            print(f"从查询中提取的情感: {target_emotions}")
-        
-        # 2. 分别计算语义和情感相似度
-        semantic_results = self.semantic_search(query, top_k=len(self.movies))
-        emotion_results = self.emotion_search(target_emotions, top_k=len(self.movies))
-        
-        # 3. 构建分数字典
-        semantic_scores = {}
-        for movie, score in semantic_results:
-            movie_id = movie['id']
-            semantic_scores[movie_id] = score
-        
-        emotion_scores = {}
-        for movie, score in emotion_results:
-            movie_id = movie['id']
-            emotion_scores[movie_id] = score
-        
-        # 4. 计算综合分数
-        combined_scores = {}
-        for movie in self.movies:
-            movie_id = movie['id']
-            semantic_score = semantic_scores.get(movie_id, 0)
-            emotion_score = emotion_scores.get(movie_id, 0)
+        # 1. 分别计算语义和情感相似度（按 self.movies 的位置对齐）
+        #    权重为0的一侧不影响综合分数，直接跳过（语义侧可省去一次查询编码），其分数记为0
+        semantic_scores = np.zeros(len(self.movies))
+        if semantic_weight != 0:
+            semantic_scores = self._semantic_similarities(query).astype(np.float64)
+        
+        emotion_scores = np.zeros(len(self.movies))
+        if emotion_weight != 0:
+            # 获取目标情感向量
+            if target_emotions is None:
+                target_emotions = self.extract_emotions_from_query(query)
+                print(f"从查询中提取的情感: {target_emotions}")
             
-            # 加权综合分数
-            combined_score = (semantic_score * semantic_weight) + (emotion_score * emotion_weight)
-            combined_scores[movie_id] = combined_score
+            similarities = self._emotion_similarities(target_emotions)
+            if similarities is not None:
+                emotion_scores = similarities.astype(np.float64)
         
-        # 5. 排序并返回结果
-        sorted_movie_ids = sorted(combined_scores.items(), key=lambda x: x[1], reverse=True)[:top_k]
+        # 2. 计算加权综合分数
+        combined_scores = semantic_scores * semantic_weight + emotion_scores * emotion_weight
+        
+        # 3. 排序并返回结果（同分时保持电影原有顺序）
+        top_indices = _top_k_indices(combined_scores, top_k)
         
         results = []
-        for movie_id, combined_score in sorted_movie_ids:
-            movie = next((m for m in self.movies if m['id'] == movie_id), None)
-            if movie:
-                # 获取单独的语义和情感分数用于显示
-                sem_score = semantic_scores.get(movie_id, 0)
-                emo_score = emotion_scores.get(movie_id, 0)
-                
-                movie_with_scores = movie.copy()
-                movie_with_scores['semantic_score'] = sem_score
-                movie_with_scores['emotion_score'] = emo_score
-                
-                results.append((movie_with_scores, combined_score))
+        for idx in top_indices:
+            movie_with_scores = self.movies[idx].copy()
+            # 单独的语义和情感分数用于显示
+            movie_with_scores['semantic_score'] = float(semantic_scores[idx])
+            movie_with_scores['emotion_score'] = float(emotion_scores[idx])
+            
+            results.append((movie_with_scores, float(combined_scores[idx])))
         
         return results
     
+    def _encode_query(self, query: str) -> np.ndarray:
+        """
+        编码查询文本（结果由 _encode_query_cached 缓存）
+        
+        参数:
+            query: 查询文本
+            
+        返回:
+            np.ndarray: L2归一化后的查询嵌入
+        """
+        return self.model.encode(query, convert_to_numpy=True, normalize_embeddings=True)
+    
     def extract_emotions_from_query(self, query: str) -> Dict[str, float]:
         """
         从查询文本中提取情感（修正版）
@@ -609,29 +1072,31 @@ class EmotionMovieRecommender:
         返回:
             Dict[str, float]: 提取到的情感及其强度（英文标签）
         """
-        # 简单的情感关键词映射（中文 -> 英文）
-        emotion_keywords = {
-            'joy': ['快乐', '开心', '高兴', '愉快', '欢乐', '喜悦', '搞笑', '幽默', '喜剧'],
-            'sadness': ['悲伤', '难过', '伤心', '忧郁', '哀伤', '悲痛', '悲剧', '伤感'],
-            'anger': ['愤怒', '生气', '气愤', '怒火', '愤慨', '恼怒', '暴力'],
-            'fear': ['恐惧', '害怕', '恐怖', '惊吓', '惊悚', '恐慌', '可怕'],
-            'love': ['爱', '爱情', '恋爱', '浪漫', '甜蜜', '温馨', '感人', '温暖'],
-            'hope': ['希望', '期望', '盼望', '期待', '憧憬', '向往'],
-            'loneliness': ['孤独', '孤单', '寂寞', '孤立', '独处', '疏离'],
-            'inspiration': ['励志', '鼓舞', '激励', '振奋', '奋发', '向上'],
-            'tension': ['紧张', '刺激', '悬疑', '惊险', '惊心动魄', '扣人心弦'],
-            'peace': ['平静', '安宁', '宁静', '祥和', '安逸', '恬静']
-        }
+        # 提取结果只取决于查询文本，按文本缓存；返回新字典，调用方修改不会影响缓存
+        extracted_emotions = dict(self._extract_emotions_cached(query))
+        print(f"查询分析结果: {extracted_emotions}")
+        return extracted_emotions
+    
+    def _extract_emotions_from_query(self, query: str) -> Tuple[Tuple[str, float], ...]:
+        """
+        提取查询情感的实际实现（结果由 _extract_emotions_cached 缓存）
         
+        参数:
+            query: 查询文本
+            
+        返回:
+            Tuple[Tuple[str, float], ...]: (情感, 强度) 元组，保持插入顺序
+        """
         # 初始化情感计数器
-        emotion_counts = {emotion: 0 for emotion in emotion_keywords.keys()}
+        emotion_counts = dict.fromkeys(_QUERY_EMOTION_KEYWORDS, 0)
         
-        # 检查查询中的情感关键词
+        # 检查查询中的情感关键词：自动机线性扫描一遍查询，每个关键词出现即计1次
+        matched = {payload for _, payload in _QUERY_EMOTION_AC.iter(query)}
         query_lower = query.lower()
-        for emotion, keywords in emotion_keywords.items():
-            for keyword in keywords:
-                if keyword in query or keyword in query_lower:
-                    emotion_counts[emotion] += 1
+        if query_lower != query:
+            matched.update(payload for _, payload in _QUERY_EMOTION_AC.iter(query_lower))
+        for emotion, _ in matched:
+            emotion_counts[emotion] += 1
         
         # 计算情感强度（基于出现次数）
         extracted_emotions = {}
@@ -659,8 +1124,7 @@ class EmotionMovieRecommender:
                 # 默认返回一个通用情感分布
                 extracted_emotions = {'joy': 0.3, 'hope': 0.3, 'inspiration': 0.4}
         
-        print(f"查询分析结果: {extracted_emotions}")
-        return extracted_emotions
+        return tuple(extracted_emotions.items())
     
     def visualize_emotion_profile(self, movie: Dict):
         """
@@ -686,6 +1150,8 @@ class EmotionMovieRecommender:
         
         emotions, values = zip(*non_zero_data)
         
+        import matplotlib.pyplot as plt
+        
         # 创建图形
         plt.figure(figsize=(10, 6))
         colors = plt.cm.Set3(np.linspace(0, 1, len(emotions)))
@@ -788,8 +1254,8 @@ def print_movie_results(query: str, results: List[Tuple[Dict, float]], show_emot
             # 显示情感向量摘要
             emotion_profile = movie.get('emotion_profile', {})
             if emotion_profile and isinstance(emotion_profile, dict):
-                top_emotions = sorted([(k, v) for k, v in emotion_profile.items() if v > 0], 
-                                     key=lambda x: x[1], reverse=True)[:3]
+                top_emotions = heapq.nlargest(3, ((k, v) for k, v in emotion_profile.items() if v > 0),
+                                              key=lambda x: x[1])
                 if top_emotions:
                     emotion_str = ", ".join([f"{e}:{v:.2f}" for e, v in top_emotions])
                     print(f"   📈 主要情感: {emotion_str}")
@@ -813,17 +1279,22 @@ def main():
     config.print_model_info()
     recommender = EmotionMovieRecommender()
     
+    # 首次前向计算要做算子初始化和内存分配，放到后台线程里与加载电影数据重叠
+    warmup_executor = ThreadPoolExecutor(max_workers=1)
+    warmup = warmup_executor.submit(recommender._encode_query, "预热")
+    
     # 2. 加载电影数据
     print("\n[2/4] 加载电影数据...")
     
     # 尝试加载JSON格式的情感语料库
     json_path = "top_250_movies/top_rated_movie_emotions_20251202_214450.json"  # 修改为您的文件路径
-    movies = recommender.load_movies_from_json(json_path)
+    movies, emotion_matrix = recommender.load_movies_from_json(json_path, return_matrix=True)
     
     # 如果JSON加载失败，尝试CSV
     if not movies:
         csv_path = "top_250_movies/top_rated_movies_20251202_214450.csv"  # 修改为您的文件路径
         movies = recommender.load_movies_from_csv(csv_path)
+        emotion_matrix = None
     
     # 如果都没有，使用示例数据
     if not movies:
@@ -831,9 +1302,16 @@ def main():
     
     print(f"加载了 {len(movies)} 部电影，其中 {sum(1 for m in movies if m.get('emotion_profile'))} 部包含情感分析")
     
+    # 等待预热结束，避免与建立索引时的编码同时使用模型
+    try:
+        warmup.result()
+    except Exception as e:
+        print(f"⚠️  模型预热失败: {e}")
+    warmup_executor.shutdown()
+    
     # 3. 索引电影
     print("\n[3/4] 建立电影索引...")
-    recommender.index_movies(movies)
+    recommender.index_movies(movies, emotion_matrix)
     
     # 4. 演示不同搜索模式
     print("\n[4/4] 演示推荐功能")
@@ -900,8 +1378,7 @@ def main():
                     print("查询不能为空")
                     continue
                 
-                top_k = input("返回结果数量 (默认5): ").strip()
-                top_k = int(top_k) if top_k.isdigit() else 5
+                top_k = _parse_int(input("返回结果数量 (默认5): "), 5)
                 
                 results = recommender.semantic_search(query, top_k)
                 print_movie_results(query, results, show_emotions=False)
@@ -934,8 +1411,7 @@ def main():
                     print("请使用'情感:强度'格式，例如: joy:0.5, sadness:0.3")
                     continue
                 
-                top_k = input("返回结果数量 (默认5): ").strip()
-                top_k = int(top_k) if top_k.isdigit() else 5
+                top_k = _parse_int(input("返回结果数量 (默认5): "), 5)
                 
                 results = recommender.emotion_search(target_emotions, top_k)
                 print_movie_results(f"情感向量: {target_emotions}", results)
@@ -961,8 +1437,7 @@ def main():
                     semantic_weight = semantic_weight / total
                     emotion_weight = emotion_weight / total
                 
-                top_k = input("返回结果数量 (默认5): ").strip()
-                top_k = int(top_k) if top_k.isdigit() else 5
+                top_k = _parse_int(input("返回结果数量 (默认5): "), 5)
                 
                 results = recommender.hybrid_search(query, semantic_weight=semantic_weight, 
                                                   emotion_weight=emotion_weight, top_k=top_k)
@@ -975,8 +1450,7 @@ def main():
                     print("心情描述不能为空")
                     continue
                 
-                top_k = input("返回结果数量 (默认5): ").strip()
-                top_k = int(top_k) if top_k.isdigit() else 5
+                top_k = _parse_int(input("返回结果数量 (默认5): "), 5)
                 
                 results = recommender.get_recommendation_by_mood(mood, top_k)
                 print_movie_results(f"心情: {mood}", results)